@@ -0,0 +1,115 @@
+"""
+Compares the sync and async (DB_ASYNC) serving modes on the dashboard routes.
+
+    python -m benchmarks.async_dashboard --requests 5000 --concurrency 500
+
+Mounts the dashboard router twice in-process, once as-is (sync endpoints
+on the threadpool, psycopg2) and once through async_router (asyncpg on the
+event loop), and fires the same mix of requests at each through httpx's
+ASGI transport, spread over the users that have transactions. The response
+cache is disabled so every request reaches Postgres. Both modes use the
+pool settings from the environment (DB_POOL_SIZE, DB_MAX_OVERFLOW).
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from src.app.api.async_routes import async_router
+from src.app.api.routes import dashboard
+from src.app.db.async_database import async_engine
+from src.app.db.database import SessionLocal, engine
+from src.app.db.models.transaction import Transaction
+from src.app.services.response_cache import response_cache
+
+ENDPOINTS = (
+    "/dashboard/overview",
+    "/dashboard/summary",
+    "/dashboard/by-category",
+    "/dashboard/by-month",
+    "/dashboard/budget-summary",
+)
+
+
+def build_app(is_async: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(async_router(dashboard.router) if is_async else dashboard.router)
+    return app
+
+
+async def run(app: FastAPI, urls, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = iter(urls)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for path, user_id in queue:
+            started = time.perf_counter()
+            response = await client.get(path, params={"user_id": user_id})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--users", type=int, default=200, help="distinct users to spread requests over")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        user_ids = db.scalars(
+            select(Transaction.user_id).distinct().order_by(Transaction.user_id).limit(args.users)
+        ).all()
+    if not user_ids:
+        raise SystemExit("No transactions to read; seed some data first.")
+
+    urls = list(itertools.islice(
+        zip(itertools.cycle(ENDPOINTS), itertools.cycle(user_ids)), args.requests
+    ))
+
+    # Every request should reach Postgres
+    response_cache.ttl = 0
+
+    async def bench() -> None:
+        for name, is_async in (("sync", False), ("async", True)):
+            app = build_app(is_async)
+            await run(app, urls[: args.concurrency], args.concurrency)  # warm the pool
+            result = await run(app, urls, args.concurrency)
+            print(
+                f"{name:>5}: {result['requests']} requests in {result['seconds']:.2f}s "
+                f"= {result['rps']:.0f} req/s, p50 {result['p50_ms']:.1f} ms, "
+                f"p99 {result['p99_ms']:.1f} ms, {result['errors']} errors"
+            )
+        await async_engine.dispose()
+
+    print(f"{len(user_ids)} users, concurrency {args.concurrency}")
+    asyncio.run(bench())
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures how long importing the app takes and checks it needs no database.
+
+    python -m benchmarks.import_time --runs 10
+
+Each run imports src.app.main in a fresh interpreter with DATABASE_URL
+pointing at a port nothing listens on, so any import-time connection
+fails the run. Prints the median wall time and the slowest project
+modules from `python -X importtime` (cumulative microseconds).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+TARGET = "src.app.main"
+UNREACHABLE_URL = "postgresql+psycopg2://nobody@127.0.0.1:9/nowhere"
+
+
+def import_once(importtime: bool = False) -> subprocess.CompletedProcess:
+    env = dict(os.environ, DATABASE_URL=UNREACHABLE_URL)
+    env.pop("DATABASE_REPLICA_URL", None)
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", f"import {TARGET}"]
+    return subprocess.run(command, env=env, capture_output=True, text=True)
+
+
+def slowest_modules(stderr: str, prefix: str, top: int):
+    """(cumulative_us, module) for the slowest `prefix` modules in -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cumulative.isdigit() and name.startswith(prefix):
+            rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = import_once()
+        timings.append(time.perf_counter() - started)
+        if result.returncode != 0:
+            raise SystemExit(f"import {TARGET} failed without a database:\n{result.stderr}")
+
+    print(
+        f"import {TARGET}: median {statistics.median(timings) * 1000:.0f} ms, "
+        f"min {min(timings) * 1000:.0f} ms over {args.runs} runs (no database reachable)"
+    )
+
+    print("\nslowest src.app modules (cumulative):")
+    for cumulative, name in slowest_modules(import_once(importtime=True).stderr, "src.app", args.top):
+        print(f"{cumulative / 1000:9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Shows how the transactions indexes change the plans of the hot read paths.
+
+    python -m benchmarks.transaction_indexes --rows 3000000
+
+Builds a throwaway copy of the transactions table (no indexes) in its own
+schema, fills it with generated rows, prints EXPLAIN ANALYZE for each query,
+then creates the indexes declared on the model and prints the plans again.
+The schema is dropped afterwards.
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from src.app.db.database import engine
+from src.app.db.models.transaction import Transaction
+
+SCHEMA = "bench_transaction_indexes"
+
+QUERIES = {
+    "list page (date_desc)": """
+        SELECT * FROM transactions
+        WHERE user_id = :user_id
+        ORDER BY date DESC, id DESC LIMIT 100
+    """,
+    "deep keyset page": """
+        SELECT * FROM transactions
+        WHERE user_id = :user_id AND (date, id) < (DATE '2022-06-01', 0)
+        ORDER BY date DESC, id DESC LIMIT 100
+    """,
+    "monthly totals": """
+        SELECT is_income, SUM(amount) FROM transactions
+        WHERE user_id = :user_id
+          AND date >= DATE '2024-03-01' AND date < DATE '2024-04-01'
+        GROUP BY is_income
+    """,
+    "category filter": """
+        SELECT * FROM transactions
+        WHERE user_id = :user_id AND category_id = :category_id
+          AND date >= DATE '2023-01-01'
+        ORDER BY date LIMIT 100
+    """,
+    "account history": """
+        SELECT date, amount FROM transactions
+        WHERE account_id = :account_id AND date >= DATE '2024-01-01'
+        ORDER BY date
+    """,
+    "amount_desc page": """
+        SELECT * FROM transactions
+        WHERE user_id = :user_id
+        ORDER BY amount DESC, id DESC LIMIT 100
+    """,
+}
+
+
+def explain_all(conn, params) -> None:
+    for name, sql in QUERIES.items():
+        plan = conn.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + sql), params).scalars().all()
+        print(f"--- {name}")
+        print("\n".join(plan))
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    args = parser.parse_args()
+
+    # Row g belongs to user 1 + g % users; for user 42 that pins g % 10 to 1
+    params = {"user_id": 42, "category_id": 42 * 10 + 1, "account_id": 42 * 3 + 1}
+
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        try:
+            conn.execute(text(
+                "CREATE TABLE transactions (LIKE public.transactions INCLUDING DEFAULTS)"
+            ))
+
+            started = time.perf_counter()
+            conn.execute(text("""
+                INSERT INTO transactions
+                    (id, amount, date, description, is_income,
+                     user_id, account_id, category_id, created_at)
+                SELECT g,
+                       (random() * 50000)::bigint,
+                       DATE '2020-01-01' + (random() * 1825)::int,
+                       'txn ' || g,
+                       random() < 0.1,
+                       u,
+                       u * 3 + (g % 3),
+                       u * 10 + (g % 10),
+                       now()
+                FROM generate_series(1, :rows) AS g,
+                     LATERAL (SELECT 1 + (g % :users) AS u) AS pick
+            """), {"rows": args.rows, "users": args.users})
+            conn.execute(text("ANALYZE transactions"))
+            print(f"Seeded {args.rows:,} rows in {time.perf_counter() - started:.1f}s\n")
+
+            print("========== WITHOUT INDEXES ==========\n")
+            explain_all(conn, params)
+
+            started = time.perf_counter()
+            for index in Transaction.__table__.indexes:
+                conn.execute(CreateIndex(index))
+            conn.execute(text("ANALYZE transactions"))
+            print(f"Built indexes in {time.perf_counter() - started:.1f}s\n")
+
+            print("========== WITH INDEXES ==========\n")
+            explain_all(conn, params)
+        finally:
+            conn.rollback()
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -120,4 +120,10 @@ export const getBudgetSummaryRequest = (userId: number) =>
     params: { user_id: userId },
   });
 
+// summary + by-category + by-month + budget-summary in one request
+export const getDashboardOverviewRequest = (userId: number) =>
+  api.get(`/dashboard/overview`, {
+    params: { user_id: userId },
+  });
+
 
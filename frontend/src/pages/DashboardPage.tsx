@@ -5,10 +5,7 @@ import {
   getAccountsRequest,
   getBudgetsRequest,
   getTransactionsRequest,
-  getDashboardSummaryRequest,
-  getDashboardByCategoryRequest,
-  getDashboardByMonthRequest,
-  getBudgetSummaryRequest,
+  getDashboardOverviewRequest,
 } from "../api/client";
 
 import {
@@ -59,26 +56,20 @@ const DashboardPage: React.FC = () => {
           accRes,
           _budRes, // unused for dashboard visuals
           txRes,
-          sumRes,
-          catRes,
-          monthRes,
-          budgetSumRes,
+          overviewRes,
         ] = await Promise.all([
           getAccountsRequest(user.id),
           getBudgetsRequest(user.id),
           getTransactionsRequest(user.id, 20),
-          getDashboardSummaryRequest(user.id),
-          getDashboardByCategoryRequest(user.id),
-          getDashboardByMonthRequest(user.id),
-          getBudgetSummaryRequest(user.id),
+          getDashboardOverviewRequest(user.id),
         ]);
 
         setAccounts(accRes.data);
         setTransactions(txRes.data);
-        setSummary(sumRes.data);
-        setCategoryTotals(catRes.data);
-        setMonthlyTotals(monthRes.data);
-        setBudgetSummary(budgetSumRes.data);
+        setSummary(overviewRes.data.summary);
+        setCategoryTotals(overviewRes.data.by_category);
+        setMonthlyTotals(overviewRes.data.by_month);
+        setBudgetSummary(overviewRes.data.budget_summary);
       } catch (err) {
         console.error(err);
         setError("Failed to load dashboard data.");
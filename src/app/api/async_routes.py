@@ -0,0 +1,91 @@
+"""
+Async variants of the sync routers, for DB_ASYNC mode.
+
+async_router(router) mirrors every route of a sync router. A route that
+takes a `db` session gets an AsyncSession from get_async_db (or
+get_async_read_db for read-only routes) and runs its existing body through
+AsyncSession.run_sync: the same queries, executed on asyncpg from the event
+loop, so a request waiting on Postgres holds no threadpool thread. Routes
+without a session (or already async) are mounted unchanged.
+
+Route bodies must not do blocking I/O of their own beyond the session;
+anything that does belongs in a sync dependency, which FastAPI runs in the
+threadpool.
+"""
+import functools
+import inspect
+
+from fastapi import APIRouter, Depends
+from fastapi.routing import APIRoute
+
+from src.app.db.async_database import get_async_db, get_async_read_db
+from src.app.db.database import get_db, get_read_db
+
+ASYNC_DEPENDENCIES = {
+    get_db: get_async_db,
+    get_read_db: get_async_read_db,
+}
+
+
+def _async_db_param(endpoint):
+    """The endpoint's `db` parameter rewired to its async dependency, or None."""
+    if inspect.iscoroutinefunction(endpoint):
+        return None
+    param = inspect.signature(endpoint).parameters.get("db")
+    dependency = getattr(param.default, "dependency", None) if param is not None else None
+    if dependency not in ASYNC_DEPENDENCIES:
+        return None
+    return param.replace(default=Depends(ASYNC_DEPENDENCIES[dependency]))
+
+
+def run_sync_endpoint(endpoint):
+    """Wraps a sync endpoint so its body runs on an AsyncSession via run_sync."""
+    signature = inspect.signature(endpoint)
+    db_param = _async_db_param(endpoint)
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, db, **kwargs):
+        return await db.run_sync(lambda session: endpoint(*args, db=session, **kwargs))
+
+    wrapper.__signature__ = signature.replace(
+        parameters=[
+            db_param if name == "db" else param
+            for name, param in signature.parameters.items()
+        ]
+    )
+    return wrapper
+
+
+def async_router(router: APIRouter) -> APIRouter:
+    """A router with the same routes as `router`, served on the async engine."""
+    mirrored = APIRouter()
+
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            mirrored.routes.append(route)
+            continue
+
+        endpoint = route.endpoint
+        if _async_db_param(endpoint) is not None:
+            endpoint = run_sync_endpoint(endpoint)
+
+        mirrored.add_api_route(
+            route.path,
+            endpoint,
+            methods=list(route.methods),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            name=route.name,
+            operation_id=route.operation_id,
+            response_class=route.response_class,
+            include_in_schema=route.include_in_schema,
+        )
+
+    return mirrored
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import date
 
-from src.app.db.database import get_db
+from src.app.core.money import to_dollars
+from src.app.db.database import get_db, get_read_db
 from src.app.db.models.account import Account
+from src.app.services.budget_progress import link_account_budgets
+from src.app.services.checkpoints import balance_as_of
+from src.app.services.response_cache import invalidate_on_commit
 from src.app.api.schemas.account import (
     AccountCreate,
     AccountRead,
@@ -31,6 +36,12 @@ def create_account(payload: AccountCreate, db: Session = Depends(get_db)):
     )
 
     db.add(account)
+    db.flush()
+
+    # Every existing budget of the user tracks the new account too
+    link_account_budgets(db, account_id=account.id)
+
+    invalidate_on_commit(db, account.user_id)
     db.commit()
     db.refresh(account)
     return account
@@ -41,7 +52,7 @@ def create_account(payload: AccountCreate, db: Session = Depends(get_db)):
 # List Accounts (by user_id)
 # -------------------------------------------------------------
 @router.get("/", response_model=List[AccountRead])
-def list_accounts(user_id: int, db: Session = Depends(get_db)):
+def list_accounts(user_id: int, db: Session = Depends(get_read_db)):
     accounts = (
         db.query(Account)
         .filter(Account.user_id == user_id)
@@ -66,6 +77,26 @@ def get_account(account_id: int, db: Session = Depends(get_db)):
     return account
 
 
+# -------------------------------------------------------------
+# Balance as of a date
+# -------------------------------------------------------------
+@router.get("/{account_id}/balance")
+def get_account_balance(account_id: int, as_of: date, db: Session = Depends(get_db)):
+    account = db.query(Account.id).filter(Account.id == account_id).first()
+
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found",
+        )
+
+    balance = balance_as_of(db, account_id, as_of)
+    # Keeps any month-end checkpoints the lookup had to create
+    db.commit()
+
+    return {"account_id": account_id, "as_of": as_of, "balance": to_dollars(balance)}
+
+
 # -------------------------------------------------------------
 # Update Account
 # (only name, type, description can be patched)
@@ -92,6 +123,7 @@ def update_account(
         if key in allowed_fields:
             setattr(account, key, value)
 
+    invalidate_on_commit(db, account.user_id)
     db.commit()
     db.refresh(account)
     return account
@@ -111,6 +143,7 @@ def delete_account(account_id: int, db: Session = Depends(get_db)):
         )
 
     db.delete(account)
+    invalidate_on_commit(db, account.user_id)
     db.commit()
     return None
 
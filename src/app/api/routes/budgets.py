@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from typing import List
+from sqlalchemy import func, select
+from typing import List, Optional
 from datetime import date
 
-from src.app.db.database import get_db
+from src.app.core.money import to_dollars
+from src.app.db.database import get_db, get_read_db
 from src.app.db.models.budget import Budget
-from src.app.db.models.account import Account
-from src.app.db.models.account_budget import AccountBudget
-from src.app.db.models.transaction import Transaction
+from src.app.db.models.budget_period import BudgetPeriod
+from src.app.services.budget_pipeline import budget_pipeline
+from src.app.services.budget_progress import current_period_row, current_period_spent, refresh_budget
+from src.app.services.response_cache import invalidate_on_commit
 
 
 from src.app.api.schemas.budget import (
@@ -20,9 +22,37 @@ from src.app.api.schemas.budget import (
 router = APIRouter(prefix="/budgets", tags=["Budgets"])
 
 
+def read_budgets(db: Session, *criteria) -> List[BudgetRead]:
+    """
+    Budgets matching `criteria`, with current_spent/remaining taken from
+    their current period row: the stored counters only move on to a new
+    period with its first delta.
+    """
+    spent = func.coalesce(BudgetPeriod.spent, 0)
+    rows = db.execute(
+        select(Budget, spent.label("spent"))
+        .outerjoin(BudgetPeriod, current_period_row(date.today()))
+        .where(*criteria)
+        .order_by(Budget.id)
+    ).all()
+
+    return [
+        BudgetRead(
+            id=budget.id,
+            name=budget.name,
+            period=budget.period,
+            user_id=budget.user_id,
+            category_id=budget.category_id,
+            target_amount=budget.target_amount,
+            current_spent=spent,
+            remaining=budget.target_amount - spent,
+        )
+        for budget, spent in rows
+    ]
+
+
 @router.post("/", response_model=BudgetRead, status_code=status.HTTP_201_CREATED)
 def create_budget(payload: BudgetCreate, db: Session = Depends(get_db)):
-
     # 1. Create the Budget
     budget = Budget(
         name=payload.name,
@@ -33,51 +63,36 @@ def create_budget(payload: BudgetCreate, db: Session = Depends(get_db)):
     )
 
     db.add(budget)
-    db.commit()
-    db.refresh(budget)
 
-    # 2. Get all accounts owned by this user
-    user_accounts = db.query(Account).filter(Account.user_id == payload.user_id).all()
+    # 2. Count spending already recorded in this category and link the
+    #    budget to all of the user's accounts, set-based
+    refresh_budget(db, budget)
 
-    # 3. Create AccountBudget rows for each account
-    for account in user_accounts:
-        link = AccountBudget(
-            account_id=account.id,
-            budget_id=budget.id,
-            current_progress=0.0
-        )
-        db.add(link)
-
-    db.commit()  # save account-budget links
-
-    # Optional but recommended
-    db.refresh(budget)
+    invalidate_on_commit(db, budget.user_id)
+    db.commit()
 
-    return budget
+    return read_budgets(db, Budget.id == budget.id)[0]
 
 
 
 
 
 @router.get("/", response_model=List[BudgetRead])
-def list_budgets(user_id: int, db: Session = Depends(get_db)):
-    budgets = (
-        db.query(Budget)
-        .filter(Budget.user_id == user_id)
-        .all()
-    )
-    return budgets
+def list_budgets(user_id: int, db: Session = Depends(get_read_db)):
+    budget_pipeline.flush()
+    return read_budgets(db, Budget.user_id == user_id)
 
 
 @router.get("/{budget_id}", response_model=BudgetRead)
 def get_budget(budget_id: int, db: Session = Depends(get_db)):
-    budget = db.query(Budget).filter(Budget.id == budget_id).first()
-    if not budget:
+    budget_pipeline.flush()
+    budgets = read_budgets(db, Budget.id == budget_id)
+    if not budgets:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Budget not found",
         )
-    return budget
+    return budgets[0]
 
 
 @router.patch("/{budget_id}", response_model=BudgetRead)
@@ -86,6 +101,7 @@ def update_budget(
     payload: BudgetUpdate,
     db: Session = Depends(get_db),
 ):
+    budget_pipeline.flush()
     budget = db.query(Budget).filter(Budget.id == budget_id).first()
     if not budget:
         raise HTTPException(
@@ -97,9 +113,14 @@ def update_budget(
     for key, value in update_data.items():
         setattr(budget, key, value)
 
+    if {"period", "category_id"} & update_data.keys():
+        refresh_budget(db, budget)
+    elif "target_amount" in update_data:
+        budget.remaining = budget.target_amount - budget.current_spent
+
+    invalidate_on_commit(db, budget.user_id)
     db.commit()
-    db.refresh(budget)
-    return budget
+    return read_budgets(db, Budget.id == budget.id)[0]
 
 
 @router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -112,26 +133,66 @@ def delete_budget(budget_id: int, db: Session = Depends(get_db)):
         )
 
     db.delete(budget)
+    invalidate_on_commit(db, budget.user_id)
     db.commit()
     return None
 
 @router.get("/{budget_id}/progress")
 def get_budget_progress(budget_id: int, db: Session = Depends(get_db)):
+    # Progress is write-behind; apply everything queued before reading it
+    budget_pipeline.flush()
     budget = db.query(Budget).filter(Budget.id == budget_id).first()
     if not budget:
         raise HTTPException(404, "Budget not found")
 
+    period_start, period_end, current_spent = current_period_spent(db, budget, date.today())
+
     percent_used = (
-        (budget.current_spent / budget.target_amount) * 100
+        (current_spent / budget.target_amount) * 100
         if budget.target_amount > 0 else 0
     )
 
     return {
         "budget_id": budget.id,
         "name": budget.name,
-        "target_amount": budget.target_amount,
-        "current_spent": budget.current_spent,
-        "remaining": budget.remaining,
+        "period": budget.period,
+        "period_start": period_start,
+        "period_end": period_end,
+        "target_amount": to_dollars(budget.target_amount),
+        "current_spent": to_dollars(current_spent),
+        "remaining": to_dollars(budget.target_amount - current_spent),
         "percent_used": round(percent_used, 2),
     }
 
+
+@router.get("/{budget_id}/periods")
+def list_budget_periods(
+    budget_id: int,
+    from_: Optional[date] = Query(None, alias="from"),
+    to: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Spending per past or current period of the budget, oldest first.
+    Periods without any spending are omitted.
+    """
+    budget_pipeline.flush()
+    budget = db.query(Budget).filter(Budget.id == budget_id).first()
+    if not budget:
+        raise HTTPException(404, "Budget not found")
+
+    query = db.query(BudgetPeriod).filter(BudgetPeriod.budget_id == budget_id)
+    if from_ is not None:
+        query = query.filter(BudgetPeriod.period_end > from_)
+    if to is not None:
+        query = query.filter(BudgetPeriod.period_start <= to)
+
+    return [
+        {
+            "period_start": p.period_start,
+            "period_end": p.period_end,
+            "spent": to_dollars(p.spent),
+            "remaining": to_dollars(budget.target_amount - p.spent),
+        }
+        for p in query.order_by(BudgetPeriod.period_start).all()
+    ]
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from src.app.db.database import get_db
+from src.app.db.database import get_db, get_read_db
 from src.app.db.models.category import Category
+from src.app.services.response_cache import invalidate_on_commit
+from src.app.services.rollups import uncategorize_rollups
 from src.app.api.schemas.category import (
     CategoryCreate,
     CategoryRead,
@@ -23,6 +25,7 @@ def create_category(payload: CategoryCreate, db: Session = Depends(get_db)):
     )
 
     db.add(category)
+    invalidate_on_commit(db, category.user_id)
     db.commit()
     db.refresh(category)
     return category
@@ -30,7 +33,7 @@ def create_category(payload: CategoryCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[CategoryRead])
-def list_categories(user_id: int, db: Session = Depends(get_db)):
+def list_categories(user_id: int, db: Session = Depends(get_read_db)):
     categories = (
         db.query(Category)
         .filter(Category.user_id == user_id)
@@ -67,6 +70,7 @@ def update_category(
     for key, value in update_data.items():
         setattr(category, key, value)
 
+    invalidate_on_commit(db, category.user_id)
     db.commit()
     db.refresh(category)
     return category
@@ -74,13 +78,17 @@ def update_category(
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_category(category_id: int, db: Session = Depends(get_db)):
-    category = db.query(Category).filter(Category.id == category_id).first()
+    # Locked so no transaction lands in the category while its rollups move
+    category = db.query(Category).filter(Category.id == category_id).with_for_update().first()
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found",
         )
 
+    # Its transactions become uncategorized, so their totals do too
+    uncategorize_rollups(db, category.id)
     db.delete(category)
+    invalidate_on_commit(db, category.user_id)
     db.commit()
     return None
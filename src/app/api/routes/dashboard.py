@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, case
+from sqlalchemy import func, literal, null, select, union_all
 from datetime import date
 
-from src.app.db.database import get_db
-from src.app.db.models.transaction import Transaction
+from src.app.core.money import money_sum, to_dollars
+from src.app.db.database import get_read_db
 from src.app.db.models.category import Category
 from src.app.db.models.budget import Budget
+from src.app.db.models.budget_period import BudgetPeriod
+from src.app.db.models.monthly_rollup import MonthlyRollup
+from src.app.services.response_cache import cached_response, response_cache
+from src.app.services.budget_pipeline import budget_pipeline
+from src.app.services.budget_progress import current_period_row
+from src.app.services.periods import month_window, trailing_months_window
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -15,43 +21,28 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 # A) SUMMARY: income, expenses, net for THIS month
 # ---------------------------------------------------
 @router.get("/summary")
-def dashboard_summary(user_id: int, db: Session = Depends(get_db)):
+@cached_response("dashboard.summary")
+def dashboard_summary(user_id: int, db: Session = Depends(get_read_db)):
     today = date.today()
-    month = today.month
-    year = today.year
+    start, _ = month_window(today)
 
-    income = (
-        db.query(func.coalesce(func.sum(Transaction.amount), 0))
-        .filter(
-            Transaction.user_id == user_id,
-            Transaction.is_income == True,
-            Transaction.date.isnot(None),
-            extract("month", Transaction.date) == month,
-            extract("year", Transaction.date) == year,
+    income, expenses = (
+        db.query(
+            money_sum(MonthlyRollup.income),
+            money_sum(MonthlyRollup.expense),
         )
-        .scalar()
-    )
-
-    expenses = (
-        db.query(func.coalesce(func.sum(Transaction.amount), 0))
         .filter(
-            Transaction.user_id == user_id,
-            Transaction.is_income == False,
-            Transaction.date.isnot(None),
-            extract("month", Transaction.date) == month,
-            extract("year", Transaction.date) == year,
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.month == start,
         )
-        .scalar()
+        .one()
     )
 
-    income_val = float(income or 0)
-    expenses_val = float(expenses or 0)
-
     return {
-        "income": income_val,
-        "expenses": expenses_val,
-        "net": income_val - expenses_val,
-        "month": f"{year}-{str(month).zfill(2)}",
+        "income": to_dollars(income),
+        "expenses": to_dollars(expenses),
+        "net": to_dollars(income - expenses),
+        "month": f"{today.year}-{str(today.month).zfill(2)}",
     }
 
 
@@ -59,72 +50,63 @@ def dashboard_summary(user_id: int, db: Session = Depends(get_db)):
 # B) CATEGORY TOTALS (this month)
 # ---------------------------------------------------
 @router.get("/by-category")
-def dashboard_by_category(user_id: int, db: Session = Depends(get_db)):
-    today = date.today()
-    month = today.month
-    year = today.year
+@cached_response("dashboard.by-category")
+def dashboard_by_category(user_id: int, db: Session = Depends(get_read_db)):
+    start, _ = month_window(date.today())
 
+    total = money_sum(MonthlyRollup.expense)
     results = (
         db.query(
             Category.name.label("category"),
-            func.coalesce(func.sum(Transaction.amount), 0).label("total"),
+            total.label("total"),
         )
-        .join(Transaction, Transaction.category_id == Category.id)
+        .join(MonthlyRollup, MonthlyRollup.category_id == Category.id)
         .filter(
-            Transaction.user_id == user_id,
-            Transaction.is_income == False,
-            Transaction.date.isnot(None),
-            extract("month", Transaction.date) == month,
-            extract("year", Transaction.date) == year,
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.month == start,
         )
         .group_by(Category.name)
+        # Categories that only saw income this month have nothing to show
+        .having(total != 0)
         .all()
     )
 
     return [
-        {"category": r.category, "total": float(r.total or 0)}
+        {"category": r.category, "total": to_dollars(r.total)}
         for r in results
     ]
 
 
 # ---------------------------------------------------
-# C) MONTHLY TOTALS (12 months)
+# C) MONTHLY TOTALS (trailing 12 months)
 # ---------------------------------------------------
 @router.get("/by-month")
-def dashboard_by_month(user_id: int, db: Session = Depends(get_db)):
+@cached_response("dashboard.by-month")
+def dashboard_by_month(user_id: int, db: Session = Depends(get_read_db)):
+    start, end = trailing_months_window(date.today(), 12)
+
     results = (
         db.query(
-            extract("year", Transaction.date).label("year"),
-            extract("month", Transaction.date).label("month"),
-            func.sum(
-                case(
-                    (Transaction.is_income == True, Transaction.amount),
-                    else_=0,
-                )
-            ).label("income"),
-            func.sum(
-                case(
-                    (Transaction.is_income == False, Transaction.amount),
-                    else_=0,
-                )
-            ).label("expenses"),
+            MonthlyRollup.month,
+            money_sum(MonthlyRollup.income).label("income"),
+            money_sum(MonthlyRollup.expense).label("expenses"),
         )
         .filter(
-            Transaction.user_id == user_id,
-            Transaction.date.isnot(None),
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.month >= start,
+            MonthlyRollup.month < end,
         )
-        .group_by("year", "month")
-        .order_by("year", "month")
-        .limit(12)
+        .group_by(MonthlyRollup.month)
+        .order_by(MonthlyRollup.month)
         .all()
     )
 
     formatted = []
     for r in results:
         formatted.append({
-            "month": f"{int(r.year)}-{str(int(r.month)).zfill(2)}",
-            "income": float(r.income or 0),
-            "expenses": float(r.expenses or 0),
+            "month": f"{r.month.year}-{str(r.month.month).zfill(2)}",
+            "income": to_dollars(r.income),
+            "expenses": to_dollars(r.expenses),
         })
 
     return formatted
@@ -133,46 +115,174 @@ def dashboard_by_month(user_id: int, db: Session = Depends(get_db)):
 # ---------------------------------------------------
 # D) BUDGET SUMMARY (for dashboard cards / bars)
 # ---------------------------------------------------
-@router.get("/budget-summary")
-def dashboard_budget_summary(user_id: int, db: Session = Depends(get_db)):
-    # all budgets for this user
-    budgets = (
-        db.query(Budget)
-        .filter(Budget.user_id == user_id)
-        .all()
+def budget_spent_query(user_id: int, today: date):
+    """
+    One row per budget of the user with what was spent in its category
+    during the budget's current period (week, month or year).
+
+    Each budget's current period row is one unique-index lookup on
+    budget_periods; budgets with no spending yet have no row and get 0.
+    """
+    return (
+        select(
+            Budget.id.label("budget_id"),
+            Budget.name,
+            Budget.target_amount,
+            func.coalesce(BudgetPeriod.spent, 0).label("spent"),
+        )
+        .outerjoin(BudgetPeriod, current_period_row(today))
+        .where(Budget.user_id == user_id)
+        .order_by(Budget.id)
     )
 
+
+def _budget_summary_row(budget_id, name, target, spent) -> dict:
+    # target and spent are cents
+    pct = (spent / target * 100) if target > 0 else 0.0
+
+    return {
+        "budget_id": budget_id,
+        "name": name,
+        "target": to_dollars(target),
+        "spent": to_dollars(spent),
+        "pct": round(pct, 2),
+    }
+
+
+def flush_budget_progress() -> None:
+    """
+    Applies queued budget progress before a route reads it. A dependency
+    rather than a call in the body, so FastAPI runs it in the threadpool
+    in async mode too.
+    """
+    budget_pipeline.flush()
+
+
+@router.get("/budget-summary", dependencies=[Depends(flush_budget_progress)])
+@cached_response("dashboard.budget-summary")
+def dashboard_budget_summary(user_id: int, db: Session = Depends(get_read_db)):
+    rows = db.execute(budget_spent_query(user_id, date.today())).all()
+
+    return [
+        _budget_summary_row(r.budget_id, r.name, r.target_amount, r.spent)
+        for r in rows
+    ]
+
+
+# ---------------------------------------------------
+# E) OVERVIEW: A + B + C + D in one round trip
+# ---------------------------------------------------
+@router.get("/overview", dependencies=[Depends(flush_budget_progress)])
+@cached_response("dashboard.overview")
+def dashboard_overview(user_id: int, db: Session = Depends(get_read_db)):
+    """
+    Returns the summary, by-category, by-month and budget-summary payloads
+    together, computed from a single statement.
+
+    One CTE sums the trailing 12 months of monthly rollups by
+    (month, category); the per-budget spend (see budget_spent_query) is
+    UNIONed onto those rows so everything comes back in one round trip.
+    """
     today = date.today()
-    month = today.month
-    year = today.year
-
-    summary = []
-
-    for b in budgets:
-        spent = (
-            db.query(func.coalesce(func.sum(Transaction.amount), 0))
-            .filter(
-                Transaction.user_id == user_id,
-                Transaction.category_id == b.category_id,
-                Transaction.is_income == False,
-                Transaction.date.isnot(None),
-                extract("month", Transaction.date) == month,
-                extract("year", Transaction.date) == year,
-            )
-            .scalar()
+    month_start, _ = month_window(today)
+    window_start, next_month = trailing_months_window(today, 12)
+
+    monthly = (
+        select(
+            MonthlyRollup.month,
+            MonthlyRollup.category_id,
+            money_sum(MonthlyRollup.income).label("income"),
+            money_sum(MonthlyRollup.expense).label("expense"),
+        )
+        .where(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.month >= window_start,
+            MonthlyRollup.month < next_month,
         )
+        .group_by(MonthlyRollup.month, MonthlyRollup.category_id)
+        .cte("monthly")
+    )
 
-        spent_val = float(spent or 0)
-        target_val = float(b.target_amount or 0)
+    totals = (
+        select(
+            literal("total").label("kind"),
+            monthly.c.month,
+            Category.name.label("name"),
+            monthly.c.income,
+            monthly.c.expense,
+            null().label("budget_id"),
+        )
+        .select_from(monthly)
+        .outerjoin(Category, Category.id == monthly.c.category_id)
+    )
+    # Budget rows reuse the columns: income = target, expense = spent
+    budget_spent = budget_spent_query(user_id, today).subquery()
+    budgets = select(
+        literal("budget"),
+        null(),
+        budget_spent.c.name,
+        budget_spent.c.target_amount,
+        budget_spent.c.spent,
+        budget_spent.c.budget_id,
+    )
 
-        pct = (spent_val / target_val * 100) if target_val > 0 else 0.0
+    rows = db.execute(union_all(totals, budgets)).all()
 
-        summary.append({
-            "budget_id": b.id,
-            "name": b.name,
-            "target": target_val,
-            "spent": spent_val,
-            "pct": round(pct, 2),
-        })
+    # Summed in cents, converted to dollars for the response
+    income = expenses = 0
+    by_category = {}
+    by_month = {}
+    budget_rows = []
+
+    for r in rows:
+        if r.kind == "budget":
+            budget_rows.append(r)
+            continue
 
-    return summary
+        bucket = by_month.setdefault(r.month, {"income": 0, "expenses": 0})
+        bucket["income"] += r.income
+        bucket["expenses"] += r.expense
+
+        if r.month != month_start:
+            continue
+
+        income += r.income
+        expenses += r.expense
+        # Same as /by-category: uncategorized spend is left out
+        if r.name is not None and r.expense:
+            by_category[r.name] = by_category.get(r.name, 0) + r.expense
+
+    budget_summary = [
+        _budget_summary_row(b.budget_id, b.name, b.income, b.expense)
+        for b in sorted(budget_rows, key=lambda b: b.budget_id)
+    ]
+
+    return {
+        "summary": {
+            "income": to_dollars(income),
+            "expenses": to_dollars(expenses),
+            "net": to_dollars(income - expenses),
+            "month": f"{today.year}-{str(today.month).zfill(2)}",
+        },
+        "by_category": [
+            {"category": name, "total": to_dollars(total)} for name, total in by_category.items()
+        ],
+        "by_month": [
+            {
+                "month": f"{m.year}-{str(m.month).zfill(2)}",
+                "income": to_dollars(totals["income"]),
+                "expenses": to_dollars(totals["expenses"]),
+            }
+            for m, totals in sorted(by_month.items())
+        ],
+        "budget_summary": budget_summary,
+    }
+
+
+# ---------------------------------------------------
+# F) RESPONSE CACHE COUNTERS
+# ---------------------------------------------------
+@router.get("/cache-stats")
+def dashboard_cache_stats():
+    """Hit/miss/eviction counters of the dashboard and summary response cache."""
+    return response_cache.stats()
@@ -1,44 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import date
-from typing import Optional, List
+from sqlalchemy import Date, DateTime, and_, case, cast, func, select, true
+from datetime import date, timedelta
+from typing import Literal, Optional
 
-from src.app.db.database import get_db
-from src.app.db.models.transaction import Transaction
+from src.app.core.money import Money, to_dollars
+from src.app.db.database import get_read_db
 from src.app.db.models.category import Category
 from src.app.db.models.account import Account
+from src.app.db.models.transaction import Transaction
+from src.app.db.models.monthly_rollup import MonthlyRollup
+from src.app.services.downsample import lttb_indices
+from src.app.services.periods import month_window, sql_interval
+from src.app.services.response_cache import cached_response
 
 router = APIRouter(prefix="/summary", tags=["Summary"])
 
 ## GETTING MONTHLY SUMMARY STUFF ##
 @router.get("/monthly")
+@cached_response("summary.monthly")
 def monthly_summary(
     user_id: int,
     year: int,
     month: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Returns monthly income, expenses, net, and category breakdown.
     """
 
     # Month boundaries
-    start_date = date(year, month, 1)
-    end_date = date(year + (month // 12), ((month % 12) + 1), 1)
+    start_date, _ = month_window(date(year, month, 1))
 
-    # Fetch transactions for the month
-    txns = (
-        db.query(Transaction)
+    # Per-category totals for the month, read from the monthly rollups.
+    # The window sums give the month's income/expenses on every row, so
+    # everything is aggregated in SQL in integer cents.
+    income = func.sum(MonthlyRollup.income)
+    expense = func.sum(MonthlyRollup.expense)
+    rows = (
+        db.query(
+            MonthlyRollup.category_id,
+            case(
+                (MonthlyRollup.category_id.is_(None), "Uncategorized"),
+                else_=func.coalesce(Category.name, "Unknown"),
+            ).label("category_name"),
+            cast(income + expense, Money).label("total"),
+            cast(func.sum(income).over(), Money).label("month_income"),
+            cast(func.sum(expense).over(), Money).label("month_expenses"),
+        )
+        .outerjoin(Category, Category.id == MonthlyRollup.category_id)
         .filter(
-            Transaction.user_id == user_id,
-            Transaction.date >= start_date,
-            Transaction.date < end_date
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.month == start_date,
         )
+        .group_by(MonthlyRollup.category_id, Category.name)
         .all()
     )
 
-    if not txns:
+    if not rows:
         return {
             "income": 0,
             "expenses": 0,
@@ -47,38 +66,16 @@ def monthly_summary(
             "account_totals": []
         }
 
-    total_income = 0
-    total_expenses = 0
-
-    # Category accumulation
-    category_map = {}
-
-    for txn in txns:
-        amt = float(txn.amount)
-
-        # Income / Expense logic
-        if txn.is_income:
-            total_income += amt
-        else:
-            total_expenses += amt
-
-        # Category breakdown
-        if txn.category_id not in category_map:
-            category_map[txn.category_id] = {
-                "category_id": txn.category_id,
-                "category_name": None,  # fill after loop
-                "total": 0
-            }
-
-        category_map[txn.category_id]["total"] += amt
-
-    # Fill category names
-    for cid, entry in category_map.items():
-        if cid is not None:
-            cat = db.query(Category).filter(Category.id == cid).first()
-            entry["category_name"] = cat.name if cat else "Unknown"
-        else:
-            entry["category_name"] = "Uncategorized"
+    total_income = rows[0].month_income
+    total_expenses = rows[0].month_expenses
+    category_breakdown = [
+        {
+            "category_id": r.category_id,
+            "category_name": r.category_name,
+            "total": to_dollars(r.total)
+        }
+        for r in rows
+    ]
 
     # Account totals
     account_totals = (
@@ -92,12 +89,12 @@ def monthly_summary(
     )
 
     return {
-        "income": round(total_income, 2),
-        "expenses": round(total_expenses, 2),
-        "net": round(total_income - total_expenses, 2),
-        "category_breakdown": list(category_map.values()),
+        "income": to_dollars(total_income),
+        "expenses": to_dollars(total_expenses),
+        "net": to_dollars(total_income - total_expenses),
+        "category_breakdown": category_breakdown,
         "account_totals": [
-            {"account_id": a[0], "name": a[1], "balance": float(a[2])}
+            {"account_id": a[0], "name": a[1], "balance": to_dollars(a[2])}
             for a in account_totals
         ]
     }
@@ -106,9 +103,10 @@ def monthly_summary(
 ## GETTING NET WORTH SUMMARY ##
 
 @router.get("/net-worth")
+@cached_response("summary.net-worth")
 def net_worth(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Returns total net worth (sum of all account balances).
@@ -126,16 +124,144 @@ def net_worth(
             "accounts": []
         }
 
-    total = sum([float(a.current_balance) for a in accounts])
+    total = sum(a.current_balance for a in accounts)
 
     return {
-        "net_worth": round(total, 2),
+        "net_worth": to_dollars(total),
         "accounts": [
             {
                 "account_id": a.id,
                 "name": a.name,
-                "balance": float(a.current_balance)
+                "balance": to_dollars(a.current_balance)
             }
             for a in accounts
         ]
     }
+
+
+## NET WORTH HISTORY ##
+
+# date_trunc() field and generate_series() step per granularity
+NET_WORTH_GRANULARITIES = {"day": "1 day", "week": "1 week", "month": "1 month"}
+
+
+def net_worth_history_query(user_id: int, start: date, end: date, granularity: str):
+    """
+    End-of-bucket balance of every account of the user, one row per
+    (bucket, account), ordered by bucket. Rows are dated with the bucket's
+    last day, or `end` for the bucket still in progress, since that is the
+    day the balance is for.
+
+    Transactions are summed per (account, bucket) and a running SUM() OVER
+    each account's buckets, anchored at starting_balance, turns those deltas
+    into balances. Everything before `start` folds into the first bucket so
+    it opens at the right balance.
+    """
+    first_bucket = cast(func.date_trunc(granularity, cast(start, DateTime)), Date)
+    step = sql_interval(NET_WORTH_GRANULARITIES[granularity])
+    series = select(
+        func.generate_series(first_bucket, cast(end, DateTime), step).label("starts")
+    ).subquery()
+    buckets = select(
+        cast(series.c.starts, Date).label("bucket"),
+        cast(
+            func.least(series.c.starts + step - sql_interval("1 day"), cast(end, DateTime)),
+            Date,
+        ).label("through"),
+    ).subquery()
+
+    signed = select(
+        Transaction.account_id,
+        func.greatest(
+            cast(func.date_trunc(granularity, Transaction.date), Date), first_bucket
+        ).label("bucket"),
+        case(
+            (Transaction.is_income == True, Transaction.amount),
+            else_=-Transaction.amount,
+        ).label("amount"),
+    ).where(
+        Transaction.user_id == user_id,
+        Transaction.date <= end,
+    ).subquery()
+
+    deltas = (
+        select(signed.c.account_id, signed.c.bucket, func.sum(signed.c.amount).label("delta"))
+        .group_by(signed.c.account_id, signed.c.bucket)
+        .subquery()
+    )
+
+    balance = cast(
+        Account.starting_balance
+        + func.sum(func.coalesce(deltas.c.delta, 0)).over(
+            partition_by=Account.id, order_by=buckets.c.bucket
+        ),
+        Money,
+    )
+
+    return (
+        select(buckets.c.through.label("date"), Account.id.label("account_id"), balance.label("balance"))
+        .select_from(Account)
+        .join(buckets, true())
+        .outerjoin(
+            deltas,
+            and_(deltas.c.account_id == Account.id, deltas.c.bucket == buckets.c.bucket),
+        )
+        .where(Account.user_id == user_id)
+        .order_by(buckets.c.bucket, Account.id)
+    )
+
+
+@router.get("/net-worth/history")
+@cached_response("summary.net-worth-history")
+def net_worth_history(
+    user_id: int,
+    from_: Optional[date] = Query(None, alias="from"),
+    to: Optional[date] = None,
+    granularity: Literal["day", "week", "month"] = "month",
+    max_points: int = Query(500, ge=3, le=5000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Returns per-account and total balances at the end of each day, week or
+    month between `from` and `to` (default: the last 12 months); each point
+    is dated with the day its balances are for, i.e. the bucket's last day
+    or `to`. Series longer than `max_points` are downsampled with LTTB on
+    the total.
+    """
+    to = to or date.today()
+    from_ = from_ or to - timedelta(days=365)
+    if from_ > to:
+        raise HTTPException(422, "'from' must not be after 'to'")
+
+    accounts = (
+        db.query(Account.id, Account.name)
+        .filter(Account.user_id == user_id)
+        .order_by(Account.id)
+        .all()
+    )
+
+    points = []
+    for row in db.execute(net_worth_history_query(user_id, from_, to, granularity)):
+        if not points or points[-1]["date"] != row.date:
+            points.append({"date": row.date, "net_worth": 0, "balances": []})
+        points[-1]["net_worth"] += row.balance
+        points[-1]["balances"].append(to_dollars(row.balance))
+
+    keep = lttb_indices(
+        [(p["date"].toordinal(), p["net_worth"]) for p in points], max_points
+    )
+
+    return {
+        "granularity": granularity,
+        "from": from_,
+        "to": to,
+        "accounts": [{"account_id": a.id, "name": a.name} for a in accounts],
+        "points": [
+            {
+                "date": points[i]["date"],
+                "net_worth": to_dollars(points[i]["net_worth"]),
+                "balances": points[i]["balances"],
+            }
+            for i in keep
+        ],
+    }
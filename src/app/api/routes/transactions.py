@@ -1,58 +1,131 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import hashlib
+import io
+import json
+import re
+import tempfile
+from datetime import date
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import delete, func, select, tuple_, update
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from src.app.db.database import get_db
+from src.app.core.money import format_dollars, to_dollars
+from src.app.db.database import (
+    get_db,
+    get_read_db,
+    open_read_session,
+    request_wrote_recently,
+)
 from src.app.db.models.account import Account
 from src.app.db.models.transaction import Transaction
 from src.app.api.schemas.transaction import (
     TransactionCreate,
     TransactionRead,
     TransactionUpdate,
+    TransactionBulkResult,
+    TransactionFilters,
+    TransactionBatchDelete,
+    TransactionBatchUpdate,
+    TransactionBatchResult,
 )
-from src.app.db.models.category import Category
 
-from src.app.services.budget_progress import update_budget_progress
+from src.app.services.idempotency import hash_body, idempotency_store
+from src.app.services.ledger import apply_entries, entry_for
+from src.app.utils.cursor import decode_cursor, encode_cursor
+from src.app.services.transaction_import import (
+    TransactionImportError,
+    import_transactions,
+    iter_csv_rows,
+    iter_json_rows,
+)
 
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
 
 # -------------------------
-# Helper: account balances
+# Helpers: filtering
 # -------------------------
-def apply_balance_change(
-    db: Session,
-    account: Account,
-    amount: float,
-    is_income: bool,
-    reverse: bool = False,
-) -> None:
+def build_search_query(search: str):
+    """
+    Turns free text into a prefix tsquery ("trader jo" -> trader:* & jo:*),
+    or None when it has no searchable words.
+    """
+    words = re.findall(r"\w+", search.lower())
+    if not words:
+        return None
+    return func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
 
-    amount = float(amount)
 
-    if reverse:
-        if is_income:
-            account.current_balance -= amount
-        else:
-            account.current_balance += amount
-    else:
-        if is_income:
-            account.current_balance += amount
-        else:
-            account.current_balance -= amount
+def apply_filters(query, filters: TransactionFilters):
+    """Applies the shared list/export filters to a Query over Transaction."""
+    query = query.filter(Transaction.user_id == filters.user_id)
+
+    if filters.account_id is not None:
+        query = query.filter(Transaction.account_id == filters.account_id)
+
+    if filters.category_id is not None:
+        query = query.filter(Transaction.category_id == filters.category_id)
+
+    if filters.is_income is not None:
+        query = query.filter(Transaction.is_income == filters.is_income)
+
+    if filters.min_date:
+        query = query.filter(Transaction.date >= filters.min_date)
+
+    if filters.max_date:
+        query = query.filter(Transaction.date <= filters.max_date)
+
+    if filters.min_amount is not None:
+        query = query.filter(Transaction.amount >= filters.min_amount)
+
+    if filters.max_amount is not None:
+        query = query.filter(Transaction.amount <= filters.max_amount)
+
+    search_query = build_search_query(filters.search) if filters.search else None
+    if search_query is not None:
+        query = query.filter(Transaction.search_vector.op("@@")(search_query))
 
-    db.add(account)
+    return query
+
+
+# sort name -> (keyset column, parse cursor value, descending?)
+# Every order is made total by breaking ties on Transaction.id.
+SORT_KEYS = {
+    "date_desc": (Transaction.date, date.fromisoformat, True),
+    "date_asc": (Transaction.date, date.fromisoformat, False),
+    "amount_desc": (Transaction.amount, int, True),
+    "amount_asc": (Transaction.amount, int, False),
+}
 
 
 # -------------------------
 # Create Transaction
 # -------------------------
 @router.post("/", response_model=TransactionRead, status_code=status.HTTP_201_CREATED)
-def create_transaction(payload: TransactionCreate, db: Session = Depends(get_db)):
+def create_transaction(
+    payload: TransactionCreate,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
 
-    account = db.query(Account).filter(Account.id == payload.account_id).first()
-    if not account:
+    # A retried request with the same Idempotency-Key gets the original response.
+    # Stored responses are already serialized (amounts in dollars), so they
+    # are sent as-is rather than validated against TransactionRead again.
+    if idempotency_key:
+        request_hash = hash_body(payload.model_dump(mode="json"))
+        replay = idempotency_store.lookup(
+            db, payload.user_id, "POST /transactions", idempotency_key, request_hash
+        )
+        if replay is not None:
+            return JSONResponse(replay, status_code=status.HTTP_201_CREATED)
+
+    account_exists = db.query(Account.id).filter(Account.id == payload.account_id).first()
+    if not account_exists:
         raise HTTPException(404, "Account not found")
 
     transaction = Transaction(
@@ -66,23 +139,254 @@ def create_transaction(payload: TransactionCreate, db: Session = Depends(get_db)
     )
 
     db.add(transaction)
+    db.flush()
+
+    # Balance + budgets move with atomic UPDATEs in the same unit of work
+    apply_entries(db, [entry_for(transaction)])
+
+    if idempotency_key:
+        response = TransactionRead.model_validate(transaction, from_attributes=True)
+        stored = idempotency_store.commit(
+            db,
+            payload.user_id,
+            "POST /transactions",
+            idempotency_key,
+            request_hash,
+            response.model_dump(mode="json"),
+        )
+        return JSONResponse(stored, status_code=status.HTTP_201_CREATED)
 
-    # 🔥 Update account
-    apply_balance_change(
-        db,
-        account=account,
-        amount=float(payload.amount),
-        is_income=payload.is_income,
-        reverse=False,
+    db.commit()
+    db.refresh(transaction)
+
+    return transaction
+
+
+# -------------------------
+# Bulk import (JSON array or CSV)
+# -------------------------
+# Uploads larger than this are spooled to disk instead of held in memory
+BULK_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _run_import(db: Session, user_id: int, rows, idempotency_key, request_hash) -> dict:
+    if idempotency_key:
+        replay = idempotency_store.lookup(
+            db, user_id, "POST /transactions/bulk", idempotency_key, request_hash
+        )
+        if replay is not None:
+            return replay
+
+    result = {"imported": import_transactions(db, user_id, rows)}
+
+    if idempotency_key:
+        return idempotency_store.commit(
+            db, user_id, "POST /transactions/bulk", idempotency_key, request_hash, result
+        )
+
+    db.commit()
+    return result
+
+
+@router.post("/bulk", response_model=TransactionBulkResult, status_code=status.HTTP_201_CREATED)
+async def bulk_import_transactions(
+    request: Request,
+    user_id: int,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Imports many transactions for one user in a single request.
+
+    Send either a JSON array of rows (Content-Type: application/json) or a
+    CSV file with a header row (Content-Type: text/csv). Columns/keys:
+    date, amount, description, is_income, account_id, category_id.
+    """
+    content_type = request.headers.get("content-type", "")
+    body = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_MAX_BYTES)
+    body_hash = hashlib.sha256(content_type.encode())
+    try:
+        async for chunk in request.stream():
+            body.write(chunk)
+            body_hash.update(chunk)
+        body.seek(0)
+
+        if "csv" in content_type:
+            rows = iter_csv_rows(body)
+        else:
+            rows = iter_json_rows(body)
+
+        return await run_in_threadpool(
+            _run_import, db, user_id, rows, idempotency_key, body_hash.hexdigest()
+        )
+    except TransactionImportError as exc:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, str(exc))
+    finally:
+        body.close()
+
+
+# -------------------------
+# Export (CSV / NDJSON)
+# -------------------------
+EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.date,
+    Transaction.amount,
+    Transaction.description,
+    Transaction.is_income,
+    Transaction.account_id,
+    Transaction.category_id,
+)
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _export_chunks(filters: TransactionFilters, format: str, pinned: bool):
+    """
+    Yields the export body in chunks of EXPORT_CHUNK_ROWS rows, reading
+    through a server-side cursor so memory stays flat however many rows
+    match. Uses its own (replica) session because it outlives the request
+    handler.
+    """
+    db = open_read_session(filters.user_id, pinned)
+    try:
+        query = (
+            apply_filters(db.query(*EXPORT_COLUMNS), filters)
+            .order_by(Transaction.date.asc(), Transaction.id.asc())
+            .yield_per(EXPORT_CHUNK_ROWS)
+        )
+        names = [column.key for column in EXPORT_COLUMNS]
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(names)
+
+        for count, row in enumerate(query, start=1):
+            record = dict(zip(names, row))
+            if format == "csv":
+                record["amount"] = format_dollars(record["amount"])
+                writer.writerow(record.values())
+            else:
+                record["date"] = record["date"].isoformat()
+                record["amount"] = to_dollars(record["amount"])
+                buffer.write(json.dumps(record) + "\n")
+
+            if count % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_transactions(
+    request: Request,
+    filters: TransactionFilters = Depends(),
+    format: str = "csv",
+):
+    """
+    Streams every transaction matching the list filters as CSV or NDJSON.
+    """
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "format must be csv or ndjson")
+
+    return StreamingResponse(
+        _export_chunks(filters, format, request_wrote_recently(request)),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{format}"',
+        },
     )
 
+
+# -------------------------
+# Batch update / delete
+# -------------------------
+# Columns needed to work out a row's balance and budget effect
+LEDGER_COLUMNS = (
+    Transaction.user_id,
+    Transaction.account_id,
+    Transaction.category_id,
+    Transaction.date,
+    Transaction.amount,
+    Transaction.is_income,
+)
+
+
+def _batch_selection(payload: TransactionBatchDelete):
+    """Returns a SELECT of the ids targeted by a batch request."""
+    if (payload.ids is None) == (payload.filters is None):
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            "Provide exactly one of ids or filters",
+        )
+
+    if payload.ids is not None:
+        return select(Transaction.id).where(Transaction.id.in_(payload.ids))
+    return apply_filters(select(Transaction.id), payload.filters)
+
+
+@router.patch("/batch", response_model=TransactionBatchResult)
+def batch_update_transactions(payload: TransactionBatchUpdate, db: Session = Depends(get_db)):
+    """
+    Applies one patch to many transactions in a single database transaction.
+    Balances and budgets receive each account's/category's net delta once.
+    """
+    update_data = payload.patch.dict(exclude_unset=True)
+    selection = _batch_selection(payload)
+
+    # Lock the targets so the old values we reverse are the ones we update
+    old_rows = db.execute(
+        select(Transaction.id, *LEDGER_COLUMNS)
+        .where(Transaction.id.in_(selection))
+        .with_for_update()
+    ).all()
+    if not old_rows or not update_data:
+        db.rollback()
+        return {"affected": len(old_rows)}
+
+    new_rows = db.execute(
+        update(Transaction)
+        .where(Transaction.id.in_([row.id for row in old_rows]))
+        .values(**update_data)
+        .returning(*LEDGER_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    apply_entries(
+        db,
+        [entry_for(row, sign=-1) for row in old_rows]
+        + [entry_for(row) for row in new_rows],
+    )
     db.commit()
-    db.refresh(transaction)
 
-    # 🔥 FIXED FOR NEW BUDGET LOGIC
-    update_budget_progress(db, transaction)
+    return {"affected": len(new_rows)}
 
-    return transaction
+
+@router.post("/batch/delete", response_model=TransactionBatchResult)
+def batch_delete_transactions(payload: TransactionBatchDelete, db: Session = Depends(get_db)):
+    """
+    Deletes many transactions with one DELETE and reverses their net
+    balance and budget effect in the same database transaction.
+    """
+    deleted_rows = db.execute(
+        delete(Transaction)
+        .where(Transaction.id.in_(_batch_selection(payload)))
+        .returning(*LEDGER_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    apply_entries(db, [entry_for(row, sign=-1) for row in deleted_rows])
+    db.commit()
+
+    return {"affected": len(deleted_rows)}
 
 
 # -------------------------
@@ -106,53 +410,28 @@ def update_transaction(
     db: Session = Depends(get_db),
 ):
 
-    transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    transaction = (
+        db.query(Transaction)
+        .filter(Transaction.id == transaction_id)
+        .with_for_update()
+        .first()
+    )
     if not transaction:
         raise HTTPException(404, "Transaction not found")
 
-    # OLD values before update
-    old_account = db.query(Account).filter(Account.id == transaction.account_id).first()
-    old_amount = float(transaction.amount)
-    old_is_income = transaction.is_income
-
-    # 🔥 Undo old account effect
-    apply_balance_change(
-        db,
-        account=old_account,
-        amount=old_amount,
-        is_income=old_is_income,
-        reverse=True,
-    )
+    # Reverse the OLD effect and apply the NEW one as a single net delta
+    old_entry = entry_for(transaction, sign=-1)
 
-    db.commit()
-    db.refresh(transaction)
-
-    # 🔥 FIXED FOR NEW BUDGET LOGIC
-    update_budget_progress(db, transaction)
-
-    # Apply updates
     update_data = payload.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(transaction, key, value)
 
-    # Re-fetch new account if it changed
-    new_account = db.query(Account).filter(Account.id == transaction.account_id).first()
-
-    # Apply NEW account change
-    apply_balance_change(
-        db,
-        account=new_account,
-        amount=float(transaction.amount),
-        is_income=transaction.is_income,
-        reverse=False,
-    )
+    db.flush()
+    apply_entries(db, [old_entry, entry_for(transaction)])
 
     db.commit()
     db.refresh(transaction)
 
-    # 🔥 FIXED FOR NEW BUDGET LOGIC
-    update_budget_progress(db, transaction)
-
     return transaction
 
 
@@ -162,25 +441,16 @@ def update_transaction(
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
 
-    transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    transaction = (
+        db.query(Transaction)
+        .filter(Transaction.id == transaction_id)
+        .with_for_update()
+        .first()
+    )
     if not transaction:
         raise HTTPException(404, "Transaction not found")
 
-    account = db.query(Account).filter(Account.id == transaction.account_id).first()
-
-    # 🔥 Undo account effect
-    apply_balance_change(
-        db,
-        account=account,
-        amount=float(transaction.amount),
-        is_income=transaction.is_income,
-        reverse=True,
-    )
-
-    db.commit()
-
-    # 🔥 FIXED FOR NEW BUDGET LOGIC
-    update_budget_progress(db, transaction)
+    apply_entries(db, [entry_for(transaction, sign=-1)])
 
     db.delete(transaction)
     db.commit()
@@ -193,59 +463,68 @@ def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
 # -------------------------
 @router.get("/", response_model=List[TransactionRead])
 def list_transactions(
-    user_id: int,
-    account_id: Optional[int] = None,
-    category_id: Optional[int] = None,
-    is_income: Optional[bool] = None,
-    min_date: Optional[str] = None,
-    max_date: Optional[str] = None,
-    min_amount: Optional[float] = None,
-    max_amount: Optional[float] = None,
-    search: Optional[str] = None,
+    response: Response,
+    filters: TransactionFilters = Depends(),
     sort: Optional[str] = "date_desc",
     limit: int = 100,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
 ):
-    query = db.query(Transaction).filter(Transaction.user_id == user_id)
-
-    if account_id is not None:
-        query = query.filter(Transaction.account_id == account_id)
-
-    if category_id is not None:
-        query = query.filter(Transaction.category_id == category_id)
-
-    if is_income is not None:
-        query = query.filter(Transaction.is_income == is_income)
-
-    if min_date:
-        query = query.filter(Transaction.date >= min_date)
-
-    if max_date:
-        query = query.filter(Transaction.date <= max_date)
+    """
+    Lists a user's transactions, newest first by default.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the
+    next page; every page then costs the same however deep it is.
+    `offset` is still honoured when no cursor is given.
+
+    `search` matches word prefixes in the description and category name
+    through the full-text index; use sort=relevance to rank the matches.
+    """
+    query = apply_filters(db.query(Transaction), filters)
+    search_query = build_search_query(filters.search) if filters.search else None
+
+    if sort == "relevance" and search_query is not None:
+        # Rank isn't a stored column, so relevance pages with offset only
+        rank = func.ts_rank(Transaction.search_vector, search_query)
+        return (
+            query.order_by(rank.desc(), Transaction.id.desc())
+                 .offset(offset)
+                 .limit(limit)
+                 .all()
+        )
 
-    if min_amount is not None:
-        query = query.filter(Transaction.amount >= min_amount)
+    if sort not in SORT_KEYS:
+        sort = "date_desc"
+    column, parse_value, descending = SORT_KEYS[sort]
+    keyset = tuple_(column, Transaction.id)
+
+    if cursor:
+        try:
+            cursor_sort, value, last_id = decode_cursor(cursor)
+            if cursor_sort != sort:
+                raise ValueError("Cursor was issued for a different sort")
+            position = (parse_value(value), int(last_id))
+        except (ValueError, ArithmeticError) as exc:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor") from exc
+
+        query = query.filter(keyset < position if descending else keyset > position)
+    elif offset:
+        query = query.offset(offset)
+
+    if descending:
+        query = query.order_by(column.desc(), Transaction.id.desc())
+    else:
+        query = query.order_by(column.asc(), Transaction.id.asc())
 
-    if max_amount is not None:
-        query = query.filter(Transaction.amount <= max_amount)
+    # One extra row tells us whether there is a next page
+    rows = query.limit(limit + 1).all()
+    page = rows[:limit]
 
-    if search:
-        search_term = f"%{search.lower()}%"
-        query = (
-            query.join(Category, isouter=True)
-                 .filter(
-                     (Transaction.description.ilike(search_term)) |
-                     (Category.name.ilike(search_term))
-                 )
+    if page and len(rows) > limit:
+        last = page[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            sort, getattr(last, column.key), last.id
         )
 
-    sort_map = {
-        "date_desc": Transaction.date.desc(),
-        "date_asc": Transaction.date.asc(),
-        "amount_desc": Transaction.amount.desc(),
-        "amount_asc": Transaction.amount.asc(),
-    }
-    query = query.order_by(sort_map.get(sort, Transaction.date.desc()))
-
-    return query.offset(offset).limit(limit).all()
+    return page
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from typing import Optional
 
+from src.app.core.money import MoneyIn, MoneyOut
+
 
 class AccountBase(BaseModel):
     name: str
@@ -13,7 +15,7 @@ class AccountCreate(BaseModel):
     type: str
     description: Optional[str] = None
     user_id: int
-    starting_balance: float
+    starting_balance: MoneyIn
 
 
 
@@ -30,7 +32,7 @@ class AccountRead(BaseModel):
     type: str
     description: Optional[str]
     user_id: int
-    starting_balance: float
-    current_balance: float
+    starting_balance: MoneyOut
+    current_balance: MoneyOut
 
     
@@ -1,10 +1,12 @@
 from pydantic import BaseModel
 from typing import Optional
 
+from src.app.core.money import MoneyIn, MoneyOut
+
 
 class BudgetBase(BaseModel):
     name: str
-    target_amount: float          # e.g. 300 for "Groceries $300"
+    target_amount: MoneyIn        # e.g. 300 for "Groceries $300"
     period: str = "monthly"       # "monthly", "weekly", etc.
 
 
@@ -15,7 +17,7 @@ class BudgetCreate(BudgetBase):
 
 class BudgetUpdate(BaseModel):
     name: Optional[str] = None
-    target_amount: Optional[float] = None
+    target_amount: Optional[MoneyIn] = None
     period: Optional[str] = None
     category_id: Optional[int] = None
 
@@ -24,7 +26,8 @@ class BudgetRead(BudgetBase):
     id: int
     user_id: int
     category_id: int
-    current_spent: float
-    remaining: float
+    target_amount: MoneyOut
+    current_spent: MoneyOut
+    remaining: MoneyOut
 
     
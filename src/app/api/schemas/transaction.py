@@ -1,10 +1,13 @@
+from dataclasses import dataclass
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date as dt_date
 
+from src.app.core.money import MoneyIn, MoneyOut
+
 
 class TransactionBase(BaseModel):
-    amount: float                 # negative for expense, positive for income OR use is_income
+    amount: MoneyIn               # negative for expense, positive for income OR use is_income
     date: dt_date
     description: Optional[str] = None
     is_income: bool = False       # True if this is income
@@ -17,7 +20,7 @@ class TransactionCreate(TransactionBase):
 
 
 class TransactionUpdate(BaseModel):
-    amount: Optional[float] = None
+    amount: Optional[MoneyIn] = None
     date: Optional[dt_date] = None
     description: Optional[str] = None
     is_income: Optional[bool] = None
@@ -25,9 +28,47 @@ class TransactionUpdate(BaseModel):
 
 
 class TransactionRead(TransactionBase):
+    amount: MoneyOut
     id: int
     user_id: int
     account_id: int
     category_id: Optional[int] = None
 
 
+
+class TransactionImportRow(TransactionBase):
+    # user_id comes from the import request, not from each row
+    account_id: int
+    category_id: Optional[int] = None
+
+
+class TransactionBulkResult(BaseModel):
+    imported: int
+
+
+@dataclass
+class TransactionFilters:
+    # Shared by list/export (as query params) and batch writes (in the body)
+    user_id: int
+    account_id: Optional[int] = None
+    category_id: Optional[int] = None
+    is_income: Optional[bool] = None
+    min_date: Optional[dt_date] = None
+    max_date: Optional[dt_date] = None
+    min_amount: Optional[MoneyIn] = None
+    max_amount: Optional[MoneyIn] = None
+    search: Optional[str] = None
+
+
+class TransactionBatchDelete(BaseModel):
+    # Select rows either by id or with the same filters as GET /transactions
+    ids: Optional[List[int]] = None
+    filters: Optional[TransactionFilters] = None
+
+
+class TransactionBatchUpdate(TransactionBatchDelete):
+    patch: TransactionUpdate
+
+
+class TransactionBatchResult(BaseModel):
+    affected: int
@@ -0,0 +1,71 @@
+"""
+Money as integer cents.
+
+Every money column is a BIGINT of cents (the Money column type), so
+balances, budgets and rollups add up exactly in integer arithmetic, both in
+Postgres and in Python. Dollars exist only at the API boundary: request
+fields typed MoneyIn accept dollars (12.34, "12.34") and hold cents;
+response fields typed MoneyOut hold cents and serialize as dollars.
+Routes that build JSON by hand call to_dollars.
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Annotated, Optional
+
+from pydantic import BeforeValidator, PlainSerializer, WithJsonSchema
+from sqlalchemy import BigInteger, cast, func
+from sqlalchemy.types import TypeDecorator
+
+CENTS = Decimal(100)
+
+
+def to_cents(dollars) -> int:
+    """Dollars (int, float, str or Decimal) to cents, rounding half away from zero."""
+    try:
+        cents = Decimal(str(dollars)) * CENTS
+    except InvalidOperation:
+        raise ValueError(f"not a valid amount: {dollars!r}")
+    if not cents.is_finite():
+        raise ValueError(f"not a valid amount: {dollars!r}")
+    return int(cents.to_integral_value(ROUND_HALF_UP))
+
+
+def to_dollars(cents: Optional[int]) -> Optional[float]:
+    return None if cents is None else cents / 100
+
+
+def format_dollars(cents: int) -> str:
+    """Cents as a fixed two-decimal string, e.g. -1234 -> "-12.34"."""
+    sign = "-" if cents < 0 else ""
+    whole, part = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{part:02d}"
+
+
+class Money(TypeDecorator):
+    """A BIGINT column of cents; Python values are ints."""
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and not isinstance(value, int):
+            raise TypeError(f"Money values are integer cents, got {value!r}")
+        return value
+
+    def process_result_value(self, value, dialect):
+        # SUM(bigint) comes back as NUMERIC unless cast (see money_sum)
+        return value if value is None or type(value) is int else int(value)
+
+
+def money_sum(column):
+    """SUM of a Money column as BIGINT cents, 0 when there are no rows."""
+    return cast(func.coalesce(func.sum(column), 0), Money)
+
+
+def _cents_from_dollars(value):
+    return None if value is None else to_cents(value)
+
+
+# Request fields: dollars in, cents held
+MoneyIn = Annotated[int, BeforeValidator(_cents_from_dollars), WithJsonSchema({"type": "number"})]
+
+# Response fields: cents held, dollars out
+MoneyOut = Annotated[int, PlainSerializer(to_dollars, return_type=float), WithJsonSchema({"type": "number"})]
@@ -0,0 +1,69 @@
+"""
+Async database access on asyncpg, used when DB_ASYNC is set (see
+src/app/api/async_routes.py). Importing this module builds the async
+engines, so it is only imported in async mode or by benchmarks.
+
+AsyncSession wraps the same RoutingSession as the sync stack, so replica
+routing, read-your-writes pinning and the after_commit hooks (response
+cache, budget pipeline) behave identically in both modes.
+"""
+from fastapi import Request
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.app.core.config import async_url, settings
+from src.app.db.database import (
+    RoutingSession,
+    mark_read_only,
+    request_user_id,
+    request_wrote_recently,
+)
+
+
+def make_async_engine(url: str):
+    """make_engine's asyncpg counterpart, with the same pool settings."""
+    server_settings = {}
+    if settings.db_statement_timeout_ms > 0:
+        server_settings["statement_timeout"] = str(settings.db_statement_timeout_ms)
+
+    return create_async_engine(
+        async_url(url),
+        echo=settings.db_echo,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={"server_settings": server_settings},
+    )
+
+
+async_engine = make_async_engine(settings.database_url)
+async_replica_engine = (
+    make_async_engine(settings.database_replica_url) if settings.database_replica_url else None
+)
+
+
+class AsyncRoutingSession(RoutingSession):
+    primary = async_engine.sync_engine
+    replica = async_replica_engine.sync_engine if async_replica_engine is not None else None
+
+
+# Route bodies return ORM objects that are serialized after the session's
+# greenlet has exited, so committed objects must not expire and lazy-load.
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=AsyncRoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    """get_read_db's async counterpart."""
+    async with AsyncSessionLocal() as db:
+        mark_read_only(db, request_user_id(request), request_wrote_recently(request))
+        yield db
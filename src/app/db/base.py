@@ -0,0 +1,4 @@
+from sqlalchemy.orm import declarative_base
+
+# Kept apart from database.py so importing a model never builds an engine
+Base = declarative_base()
@@ -1,4 +1,193 @@
-from database import Base, engine
-from models import *
+"""
+Creates the schema and brings existing databases up to date.
 
-Base.metadata.create_all(engine)
+    python -m src.app.db.init_db
+
+create_all() only creates missing tables, so columns and triggers added to
+an existing table are applied by the idempotent UPGRADES below, and any
+index declared on a model but missing from the database is built with
+CREATE INDEX CONCURRENTLY so large tables stay writable meanwhile.
+Monthly rollups and budget periods are backfilled once, the first time
+their table is found empty while there is data to derive it from.
+
+The app runs this from its lifespan through ensure_schema(), which first
+compares a fingerprint of the expected DDL with the one recorded in
+schema_version: an up-to-date database costs one SELECT per process, and
+importing models or routers never touches the database.
+"""
+import hashlib
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, exists, func, select, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from src.app.core.money import Money
+from src.app.db.base import Base
+from src.app.db.database import NO_STATEMENT_TIMEOUT, engine
+from src.app.db.models.budget import Budget
+from src.app.db.models.budget_period import BudgetPeriod
+from src.app.db.models.monthly_rollup import MonthlyRollup
+from src.app.db.models.transaction import SEARCH_VECTOR_DDL, Transaction
+from src.app.services.budget_progress import rebase_budget_counters, rebuild_budget_periods
+from src.app.services.rollups import rebuild_rollups
+
+
+def money_column_upgrade(table: str, column: str) -> str:
+    """Converts a dollars column (NUMERIC or FLOAT) to BIGINT cents, once."""
+    return f"""
+    DO $$
+    BEGIN
+        IF (SELECT data_type FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = '{table}' AND column_name = '{column}') <> 'bigint' THEN
+            ALTER TABLE {table} ALTER COLUMN {column} TYPE BIGINT USING round({column} * 100);
+        END IF;
+    END
+    $$
+    """
+
+
+UPGRADES = [
+    # Transaction search (tsvector + triggers; the GIN index is created below)
+    "ALTER TABLE transactions ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    *SEARCH_VECTOR_DDL,
+    """
+    UPDATE transactions
+    SET search_vector = transactions_search_vector(description, category_id)
+    WHERE search_vector IS NULL
+    """,
+    # Money columns hold integer cents (core/money.py)
+    *(
+        money_column_upgrade(table.name, column.name)
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, Money)
+    ),
+    # Write-behind budget deltas are fenced by rebuild generation
+    "ALTER TABLE budgets ADD COLUMN IF NOT EXISTS generation INTEGER NOT NULL DEFAULT 0",
+    # Deleting a category must not drop its rollups (services/rollups.py)
+    """
+    ALTER TABLE monthly_rollups
+        DROP CONSTRAINT IF EXISTS monthly_rollups_category_id_fkey,
+        ADD CONSTRAINT monthly_rollups_category_id_fkey
+            FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL
+    """,
+]
+
+
+def create_missing_indexes() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SET statement_timeout = 0"))
+        try:
+            for table in Base.metadata.sorted_tables:
+                for index in sorted(table.indexes, key=lambda i: i.name):
+                    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=conn.dialect))
+                    conn.execute(text(ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+        finally:
+            conn.execute(text("RESET statement_timeout"))
+
+
+def _has_rows(db: Session, model) -> bool:
+    return db.scalar(select(exists().where(model.id.isnot(None))))
+
+
+def backfill_derived_tables() -> None:
+    with Session(engine) as db, db.begin():
+        db.execute(NO_STATEMENT_TIMEOUT)
+        if not _has_rows(db, Transaction):
+            return
+        if not _has_rows(db, MonthlyRollup):
+            rebuild_rollups(db)
+        if _has_rows(db, Budget) and not _has_rows(db, BudgetPeriod):
+            rebuild_budget_periods(db)
+            # Counters from before budget periods hold all-time totals
+            rebase_budget_counters(db)
+
+
+def init_db() -> None:
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(NO_STATEMENT_TIMEOUT)
+        for statement in UPGRADES:
+            conn.execute(text(statement))
+
+    create_missing_indexes()
+    backfill_derived_tables()
+    record_schema_version(schema_fingerprint())
+
+
+# -------------------------
+# Schema version check
+# -------------------------
+# Not part of Base.metadata: it describes the schema rather than belonging to it
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+)
+
+# pg_advisory_lock key, so only one booting worker migrates at a time
+SCHEMA_LOCK_ID = 0x5F1A_0001
+
+_schema_ready = False
+
+
+def schema_fingerprint() -> str:
+    """sha256 of every CREATE TABLE/INDEX and upgrade this code expects."""
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode())
+    for statement in UPGRADES:
+        digest.update(statement.encode())
+    return digest.hexdigest()
+
+
+def recorded_schema_version():
+    """The fingerprint the database was last migrated to, or None."""
+    try:
+        with engine.connect() as conn:
+            return conn.scalar(select(schema_version.c.fingerprint).where(schema_version.c.id == 1))
+    except ProgrammingError:  # no schema_version table yet
+        return None
+
+
+def record_schema_version(fingerprint: str) -> None:
+    schema_version.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(schema_version.delete())
+        conn.execute(schema_version.insert().values(id=1, fingerprint=fingerprint))
+
+
+def ensure_schema() -> None:
+    """
+    Runs init_db() if the database is behind this code's schema. Checked
+    once per process; concurrent workers serialize on an advisory lock and
+    all but the first find the work already done.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+
+    expected = schema_fingerprint()
+    if recorded_schema_version() != expected:
+        with engine.connect() as lock:
+            lock.execute(select(func.pg_advisory_lock(SCHEMA_LOCK_ID)))
+            try:
+                if recorded_schema_version() != expected:
+                    init_db()
+            finally:
+                lock.execute(select(func.pg_advisory_unlock(SCHEMA_LOCK_ID)))
+                lock.commit()
+
+    _schema_ready = True
+
+
+if __name__ == "__main__":
+    init_db()
@@ -4,6 +4,10 @@ from .category import Category
 from .budget import Budget
 from .transaction import Transaction
 from .account_budget import AccountBudget
+from .idempotency_key import IdempotencyKey
+from .monthly_rollup import MonthlyRollup
+from .balance_checkpoint import BalanceCheckpoint
+from .budget_period import BudgetPeriod
 
 __all__ = [
     "User",
@@ -12,5 +16,9 @@ __all__ = [
     "Budget",
     "Transaction",
     "AccountBudget",
+    "IdempotencyKey",
+    "MonthlyRollup",
+    "BalanceCheckpoint",
+    "BudgetPeriod",
 ]
 
@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine, func, Numeric, Integer, String, Float, Column, DateTime, Date, Boolean, ForeignKey
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
-from ..database import Base
+from src.app.core.money import Money
+from ..base import Base
 
 
 class Account(Base):
@@ -11,8 +12,8 @@ class Account(Base):
     type = Column(String, nullable=False)
     description = Column(String, nullable=True)
 
-    starting_balance = Column(Float, nullable=False)
-    current_balance = Column(Float, nullable=False)
+    starting_balance = Column(Money, nullable=False)
+    current_balance = Column(Money, nullable=False)
 
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
 
@@ -1,15 +1,19 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
-from ..database import Base
+from src.app.core.money import Money
+from ..base import Base
 
 class AccountBudget(Base):
     __tablename__ = "account_budgets"
+    __table_args__ = (
+        Index("ix_account_budgets_budget_account", "budget_id", "account_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
     budget_id = Column(Integer, ForeignKey("budgets.id"), nullable=False)
 
-    current_progress = Column(Float, nullable=False, default=0.0)
+    current_progress = Column(Money, nullable=False, default=0)
 
     account = relationship("Account", back_populates="account_budgets")
     budget = relationship("Budget", back_populates="account_budgets")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, UniqueConstraint
+from src.app.core.money import Money
+from ..base import Base
+
+
+class BalanceCheckpoint(Base):
+    """
+    Balance of an account at the end of a month (all transactions dated on
+    or before `as_of`). Maintained by services/checkpoints.py.
+    """
+    __tablename__ = "balance_checkpoints"
+    __table_args__ = (
+        # Also the index behind "latest checkpoint on or before a date"
+        UniqueConstraint("account_id", "as_of", name="uq_balance_checkpoints_account_as_of"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False)
+    as_of = Column(Date, nullable=False)  # last day of the month
+    balance = Column(Money, nullable=False)
@@ -1,14 +1,19 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
-from ..database import Base
+from src.app.core.money import Money
+from ..base import Base
 
 
 class Budget(Base):
     __tablename__ = "budgets"
+    __table_args__ = (
+        # Budget matching for transaction writes (services/budget_progress.py)
+        Index("ix_budgets_user_category", "user_id", "category_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    target_amount = Column(Float, nullable=False)
+    target_amount = Column(Money, nullable=False)
     period = Column(String, nullable=False)  # "monthly", "weekly", "yearly", etc.
 
     # Owner + category this budget tracks
@@ -16,8 +21,11 @@ class Budget(Base):
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
 
     # 🔥 Progress tracking
-    current_spent = Column(Float, nullable=False, default=0.0)
-    remaining = Column(Float, nullable=False, default=0.0)
+    current_spent = Column(Money, nullable=False, default=0)
+    remaining = Column(Money, nullable=False, default=0)
+    # Bumped by every rebuild from transactions; queued pipeline deltas
+    # carry the generation they were resolved against (budget_progress.py)
+    generation = Column(Integer, nullable=False, default=0, server_default="0")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, UniqueConstraint
+from src.app.core.money import Money
+from ..base import Base
+
+
+class BudgetPeriod(Base):
+    """
+    What was spent against a budget in one of its periods [period_start,
+    period_end). Maintained by services/budget_progress.py.
+    """
+    __tablename__ = "budget_periods"
+    __table_args__ = (
+        # Also the index behind the current-period lookup
+        UniqueConstraint("budget_id", "period_start", name="uq_budget_periods_budget_start"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    budget_id = Column(Integer, ForeignKey("budgets.id", ondelete="CASCADE"), nullable=False)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)  # exclusive
+
+    spent = Column(Money, nullable=False, default=0)
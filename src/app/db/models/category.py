@@ -1,8 +1,6 @@
-print(">>> LOADING CATEGORY MODEL FROM:", __file__)
-
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
 from sqlalchemy.orm import relationship
-from ..database import Base
+from ..base import Base
 
 class Category(Base):
     __tablename__ = 'categories'
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index, func, literal_column
+from src.app.core.money import Money
+from ..base import Base
+
+
+class MonthlyRollup(Base):
+    """
+    Per (user, month, category, account) totals of transactions, kept in
+    step with every transaction write by services/ledger.py. Rebuild with
+    `python -m src.app.services.rollups`.
+    """
+    __tablename__ = "monthly_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False)  # first day of the month
+    # Deleting a category moves its rollups to the NULL category first
+    # (rollups.uncategorize_rollups); never drop them with it
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False)
+
+    income = Column(Money, nullable=False, default=0)
+    expense = Column(Money, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+
+# Upsert target; COALESCE lets uncategorized rows (NULL category) conflict too.
+# The 0 is inlined: a bound parameter would not match the index expression.
+ROLLUP_KEY = (
+    MonthlyRollup.user_id,
+    MonthlyRollup.month,
+    MonthlyRollup.account_id,
+    func.coalesce(MonthlyRollup.category_id, literal_column("0")),
+)
+Index("uq_monthly_rollups_key", *ROLLUP_KEY, unique=True)
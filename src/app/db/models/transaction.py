@@ -1,15 +1,18 @@
 from sqlalchemy import (
-    Column, Integer, Numeric, String, Date, Boolean, ForeignKey, DateTime, func
+    Column, Integer, String, Date, Boolean, ForeignKey, DateTime, func,
+    DDL, Index, event,
 )
-from sqlalchemy.orm import relationship
-from ..database import Base
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+from src.app.core.money import Money
+from ..base import Base
 
 class Transaction(Base):
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
 
-    amount = Column(Numeric(12, 2), nullable=False)
+    amount = Column(Money, nullable=False)
     date = Column(Date, nullable=False)
     description = Column(String, nullable=True)
     is_income = Column(Boolean, nullable=False, default=False)
@@ -21,7 +24,79 @@ class Transaction(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    # Full-text search over description (weight A) + category name (weight B).
+    # Maintained by the triggers in SEARCH_VECTOR_DDL, never written by the app.
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+
     # Relationships
     user = relationship("User", back_populates="transactions")
     account = relationship("Account", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
+
+    __table_args__ = (
+        Index("ix_transactions_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+# Composite indexes shaped after the read paths. Every one leads with the
+# column the queries pin by equality and then ranges/orders over date:
+#   - list/keyset pages, dashboards and summaries: user_id + date range
+#   - category filters and per-category aggregates: user_id + category_id
+#   - per-account history: account_id + date
+#   - amount_asc/amount_desc keyset pages: user_id + amount
+# Keyset pages order by (date, id) both ascending or both descending, which
+# an all-ascending index serves by scanning forwards or backwards.
+Index("ix_transactions_user_date_id", Transaction.user_id, Transaction.date, Transaction.id)
+Index("ix_transactions_user_category_date", Transaction.user_id, Transaction.category_id, Transaction.date)
+Index("ix_transactions_account_date", Transaction.account_id, Transaction.date)
+Index("ix_transactions_user_amount_id", Transaction.user_id, Transaction.amount, Transaction.id)
+
+
+# Functions/triggers that keep transactions.search_vector up to date, including
+# when a category is renamed. Every statement is safe to re-run.
+SEARCH_VECTOR_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION transactions_search_vector(text, integer)
+    RETURNS tsvector LANGUAGE sql STABLE AS $$
+        SELECT setweight(to_tsvector('simple', coalesce($1, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(
+                   (SELECT name FROM categories WHERE id = $2), '')), 'B')
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION transactions_search_vector_trigger()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := transactions_search_vector(NEW.description, NEW.category_id);
+        RETURN NEW;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS transactions_search_vector_update ON transactions",
+    """
+    CREATE TRIGGER transactions_search_vector_update
+    BEFORE INSERT OR UPDATE OF description, category_id ON transactions
+    FOR EACH ROW EXECUTE FUNCTION transactions_search_vector_trigger()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION categories_refresh_search_vector()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE transactions
+        SET search_vector = transactions_search_vector(description, category_id)
+        WHERE category_id = NEW.id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS categories_search_vector_refresh ON categories",
+    """
+    CREATE TRIGGER categories_search_vector_refresh
+    AFTER UPDATE OF name ON categories
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION categories_refresh_search_vector()
+    """,
+]
+
+for _statement in SEARCH_VECTOR_DDL:
+    event.listen(Transaction.__table__, "after_create", DDL(_statement))
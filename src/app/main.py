@@ -1,13 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import all routers
 from src.app.api.routes import auth, accounts, categories, budgets, transactions, dashboard
 from src.app.api.routes.summary import router as summary_router
+from src.app.core.config import settings
+from src.app.db.database import track_request_writes
+from src.app.db.init_db import ensure_schema
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema work happens here, never at import time
+    if settings.db_init_on_startup:
+        await run_in_threadpool(ensure_schema)
+    yield
+    if settings.db_async:
+        from src.app.db.async_database import async_engine
+
+        await async_engine.dispose()
+
 
 app = FastAPI(
     title="Personal Finance App",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # ---------------------------
@@ -22,8 +42,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Read-your-writes cookie for requests that commit
+app.middleware("http")(track_request_writes)
+
 # ---------------------------
 # Routers
 # ---------------------------
@@ -31,9 +55,18 @@ app.include_router(auth.router)
 app.include_router(accounts.router)
 app.include_router(categories.router)
 app.include_router(budgets.router)
-app.include_router(transactions.router)
-app.include_router(summary_router)
-app.include_router(dashboard.router)
+
+# DB_ASYNC serves the high-traffic routers on the asyncpg engine
+if settings.db_async:
+    from src.app.api.async_routes import async_router
+
+    app.include_router(async_router(transactions.router))
+    app.include_router(async_router(summary_router))
+    app.include_router(async_router(dashboard.router))
+else:
+    app.include_router(transactions.router)
+    app.include_router(summary_router)
+    app.include_router(dashboard.router)
 
 # ---------------------------
 # Root endpoint
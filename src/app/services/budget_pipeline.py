@@ -0,0 +1,130 @@
+"""
+Write-behind pipeline for budget progress.
+
+Transaction writes no longer write budget tables. The ledger resolves its
+budget deltas to (budget_id, generation, account_id, date) keys and hands
+them to enqueue_on_commit. Once the write commits they are merged into an
+in-memory map, so many writes to the same key become one delta. A
+background thread flushes the map every FLUSH_INTERVAL seconds through
+apply_budget_deltas: one locking budget lookup and a few set-based
+statements per batch. A rolled-back write enqueues nothing.
+
+Readers of budget progress call flush() first, which synchronously applies
+everything this process has queued. Deltas queued by other worker processes
+land within one flush interval, and each flush drops the affected users'
+cached responses once it commits. Rebuilds from transactions need no flush:
+they bump the budgets' generation, and deltas queued before are dropped
+(see services/budget_progress.py). Deltas lost to a crash are repaired by
+`python -m src.app.services.reconcile`.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.app.db.database import SessionLocal
+from src.app.services.budget_progress import apply_budget_deltas
+
+FLUSH_INTERVAL = 0.5  # seconds
+FLUSH_BATCH_KEYS = 5_000  # wake the worker early once this many keys are queued
+
+_PENDING_DELTAS = "budget_pipeline_deltas"
+
+logger = logging.getLogger(__name__)
+
+
+class BudgetPipeline:
+    def __init__(self, session_factory=SessionLocal, interval: float = FLUSH_INTERVAL):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()        # guards _pending
+        self._flush_lock = threading.Lock()  # one flush at a time, in order
+        self._wake = threading.Event()
+        self._worker = None
+
+    def enqueue(self, deltas) -> None:
+        """Merges deltas into the queue; the worker applies them shortly."""
+        with self._lock:
+            for key, delta in deltas.items():
+                self._pending[key] += delta
+            queued = len(self._pending)
+        self._ensure_worker()
+        if queued >= FLUSH_BATCH_KEYS:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Applies everything queued so far in one database transaction and
+        returns the number of keys written. Waits for an in-progress
+        background flush, so on return all earlier deltas are committed.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, defaultdict(int)
+
+            try:
+                with self.session_factory() as db:
+                    apply_budget_deltas(db, batch)
+                    db.commit()
+            except Exception:
+                # Put the batch back in front of newer deltas and retry later
+                with self._lock:
+                    for key, delta in self._pending.items():
+                        batch[key] += delta
+                    self._pending = batch
+                raise
+
+            return len(batch)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="budget-pipeline", daemon=True
+                )
+                self._worker.start()
+                atexit.register(self._flush_quietly)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self._flush_quietly()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("budget progress flush failed; will retry")
+
+
+budget_pipeline = BudgetPipeline()
+
+
+def enqueue_on_commit(db: Session, deltas) -> None:
+    """Queues budget deltas for the pipeline once db's current transaction commits."""
+    if not deltas:
+        return
+    pending = db.info.setdefault(_PENDING_DELTAS, defaultdict(int))
+    for key, delta in deltas.items():
+        pending[key] += delta
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_committed(session: Session) -> None:
+    deltas = session.info.pop(_PENDING_DELTAS, None)
+    if deltas:
+        budget_pipeline.enqueue(deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_DELTAS, None)
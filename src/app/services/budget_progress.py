@@ -1,33 +1,428 @@
+"""
+Period-aware budget progress.
+
+budget_periods holds one row per budget per period (week, month or year,
+per Budget.period) with what was spent in it; the current period's row is
+what progress endpoints read, and older rows are the budget's history.
+Budget.current_spent/remaining are re-read from the current period's row
+whenever a delta lands in it, so they move on to a new period with its
+first delta; API responses read the period row itself (current_period_row),
+which is right from the period's first day. AccountBudget.current_progress
+adds up the current period's deltas and is re-based by rebuilds.
+
+Progress is written behind (services/budget_pipeline.py), possibly by
+another process, so a rebuild from transactions can already count a write
+whose delta is still queued. Writes therefore resolve their deltas to
+budgets inside their own transaction, under a KEY SHARE lock on the user,
+and tag them with the budget's generation. Every rebuild first locks the
+user's row FOR UPDATE, which waits for those writes to commit, and bumps
+the generation; apply_budget_deltas drops deltas of an older generation
+because the rebuild has already counted them.
+"""
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import Date, and_, bindparam, case, cast, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.app.db.models.account import Account
 from src.app.db.models.budget import Budget
+from src.app.db.models.budget_period import BudgetPeriod
 from src.app.db.models.account_budget import AccountBudget
+from src.app.db.models.transaction import Transaction
+from src.app.db.models.user import User
+from src.app.services.periods import BUDGET_PERIODS, PERIOD_UNITS, period_window, sql_interval
+from src.app.services.response_cache import invalidate_on_commit
 
 
-def update_budget_progress(db, transaction):
-    # Only update budgets for expenses
-    if transaction.is_income:
-        return
+def period_start_of(period_column, day):
+    """SQL for the first day of the budget period containing `day`."""
+    unit = case(
+        *[(period_column == period, unit) for period, unit in PERIOD_UNITS.items()],
+        else_="month",
+    )
+    return cast(func.date_trunc(unit, day), Date)
+
+
+def period_end_of(period_column, start):
+    """SQL for the (exclusive) end of the budget period starting at `start`."""
+    length = case(
+        *[
+            (period_column == period, sql_interval(f"1 {unit}"))
+            for period, unit in PERIOD_UNITS.items()
+        ],
+        else_=sql_interval("1 month"),
+    )
+    return cast(start + length, Date)
+
+
+def current_period_window(period_column, today: date):
+    """SQL for each budget's current [start, end) window (CASEs over today's windows)."""
+    windows = {period: period_window(period, today) for period in BUDGET_PERIODS}
+    return tuple(
+        case(
+            *[(period_column == period, window[i]) for period, window in windows.items()],
+            else_=windows["monthly"][i],
+        )
+        for i in (0, 1)
+    )
+
+
+def current_period_row(today: date):
+    """
+    Join condition for each budget's current budget_periods row: one
+    unique-index lookup. Budgets with no spending yet have no row.
+    """
+    return and_(
+        BudgetPeriod.budget_id == Budget.id,
+        BudgetPeriod.period_start == current_period_window(Budget.period, today)[0],
+    )
 
-    # Find the budget linked to this transaction
-    budget = db.query(Budget).filter(
-        Budget.category_id == transaction.category_id
-    ).first()
 
-    if not budget:
+def match_budgets(db, pairs):
+    """
+    Every budget of the given (user_id, category_id) pairs, as
+    {(user_id, category_id): [(budget_id, generation), ...]}, from one query
+    on the (user_id, category_id) index.
+    """
+    if not pairs:
+        return {}
+
+    rows = db.execute(
+        select(Budget.id, Budget.user_id, Budget.category_id, Budget.generation)
+        .where(tuple_(Budget.user_id, Budget.category_id).in_(sorted(pairs)))
+        .order_by(Budget.id)
+    ).all()
+
+    matches = defaultdict(list)
+    for row in rows:
+        matches[(row.user_id, row.category_id)].append((row.id, row.generation))
+    return matches
+
+
+def resolve_budget_deltas(db, deltas):
+    """
+    Turns the expense deltas of a write, keyed (user_id, category_id,
+    account_id, date), into {(budget_id, generation, account_id, date): delta}
+    for the pipeline. Call inside the write's transaction: the KEY SHARE lock
+    on the users makes rebuilds wait for it, and the generations are read
+    after taking it, so they tell whether a later rebuild counted the write.
+    """
+    if not deltas:
+        return {}
+
+    db.execute(
+        select(User.id)
+        .where(User.id.in_({user_id for user_id, _, _, _ in deltas}))
+        .order_by(User.id)
+        .with_for_update(read=True, key_share=True)
+    )
+    matches = match_budgets(db, {(user_id, category_id) for user_id, category_id, _, _ in deltas})
+
+    resolved = defaultdict(int)
+    for (user_id, category_id, account_id, day), delta in deltas.items():
+        for budget_id, generation in matches.get((user_id, category_id), ()):
+            resolved[(budget_id, generation, account_id, day)] += delta
+    return resolved
+
+
+def apply_budget_deltas(db, deltas):
+    """
+    Adds expense deltas to budget progress.
+
+    `deltas` maps (budget_id, generation, account_id, date) to the net
+    expense amount to add, as resolved by resolve_budget_deltas. Deltas of a
+    deleted budget, or of a generation a rebuild has since replaced, are
+    dropped. The rest go on the budget's period row for that date (created
+    on first use) and, when that period is the current one, on its counters
+    and on the account's AccountBudget row. That is one locking lookup plus
+    at most one statement per table, visited in id order so concurrent
+    writers lock rows in the same order. The owners' cached responses are
+    dropped once the caller commits.
+    """
+    if not deltas:
         return
 
-    # Add to overall budget progress
-    budget.current_spent += float(transaction.amount)
-    budget.remaining = budget.target_amount - budget.current_spent
+    # Locked so a rebuild cannot bump a generation between check and write
+    budgets_now = {
+        row.id: row
+        for row in db.execute(
+            select(Budget.id, Budget.user_id, Budget.generation, Budget.period)
+            .where(Budget.id.in_({budget_id for budget_id, _, _, _ in deltas}))
+            .order_by(Budget.id)
+            .with_for_update(key_share=True)
+        )
+    }
+
+    current_starts = {period: period_window(period, date.today())[0] for period in BUDGET_PERIODS}
+    period_totals = defaultdict(int)
+    period_ends = {}
+    budget_totals = defaultdict(int)
+    link_totals = defaultdict(int)
+    changed_users = set()
+
+    for (budget_id, generation, account_id, day), delta in deltas.items():
+        budget = budgets_now.get(budget_id)
+        if budget is None or budget.generation != generation:
+            continue
+        if delta:
+            changed_users.add(budget.user_id)
+        period = budget.period if budget.period in BUDGET_PERIODS else "monthly"
+        start, end = period_window(period, day)
+        period_totals[(budget_id, start)] += delta
+        period_ends[(budget_id, start)] = end
+        if start == current_starts[period]:
+            budget_totals[(budget_id, start)] += delta
+            link_totals[(budget_id, account_id)] += delta
+
+    budget_periods = BudgetPeriod.__table__
+    budgets = Budget.__table__
+    account_budgets = AccountBudget.__table__
+
+    period_rows = [
+        {
+            "budget_id": budget_id,
+            "period_start": start,
+            "period_end": period_ends[(budget_id, start)],
+            "spent": delta,
+        }
+        for (budget_id, start), delta in sorted(period_totals.items())
+        if delta
+    ]
+    if period_rows:
+        insert_periods = pg_insert(budget_periods).values(period_rows)
+        db.execute(
+            insert_periods.on_conflict_do_update(
+                index_elements=["budget_id", "period_start"],
+                set_={"spent": budget_periods.c.spent + insert_periods.excluded.spent},
+            )
+        )
+
+    # Counters are set from the period row just written rather than
+    # incremented, so the first delta of a new period also resets them
+    budget_rows = [
+        {"b_id": budget_id, "b_start": start}
+        for (budget_id, start), delta in sorted(budget_totals.items())
+        if delta
+    ]
+    if budget_rows:
+        db.execute(
+            budgets.update()
+            .where(
+                budgets.c.id == bindparam("b_id"),
+                budget_periods.c.budget_id == budgets.c.id,
+                budget_periods.c.period_start == bindparam("b_start"),
+            )
+            .values(
+                current_spent=budget_periods.c.spent,
+                remaining=budgets.c.target_amount - budget_periods.c.spent,
+            ),
+            budget_rows,
+        )
+
+    link_rows = [
+        {"b_id": budget_id, "b_account_id": account_id, "delta": delta}
+        for (budget_id, account_id), delta in sorted(link_totals.items())
+        if delta
+    ]
+    if link_rows:
+        db.execute(
+            account_budgets.update()
+            .where(
+                account_budgets.c.budget_id == bindparam("b_id"),
+                account_budgets.c.account_id == bindparam("b_account_id"),
+            )
+            .values(current_progress=account_budgets.c.current_progress + bindparam("delta")),
+            link_rows,
+        )
+
+    # Cached dashboards may have been computed before these deltas landed
+    for user_id in sorted(changed_users):
+        invalidate_on_commit(db, user_id)
+
+
+def lock_users_for_rebuild(db, user_ids) -> None:
+    """
+    Locks the users' rows FOR UPDATE in id order, which waits for their
+    in-flight writes and holds off new ones. Rebuilds take it before they
+    write any budget row: the order is always user, then budget.
+    """
+    db.execute(
+        select(User.id)
+        .where(User.id.in_(user_ids))
+        .order_by(User.id)
+        .with_for_update()
+    )
+
+
+def rebuild_budget_periods(db, budget_id=None, user_id=None) -> None:
+    """
+    Recomputes period rows from transactions for one budget, one user's
+    budgets, or all, with one grouped INSERT ... SELECT, after fencing off
+    the pipeline deltas those transactions already account for (see the
+    module docstring). Does not commit.
+    """
+    rebuilt = select(Budget.id)
+    if budget_id is not None:
+        rebuilt = rebuilt.where(Budget.id == budget_id)
+    if user_id is not None:
+        rebuilt = rebuilt.where(Budget.user_id == user_id)
+
+    lock_users_for_rebuild(db, rebuilt.with_only_columns(Budget.user_id))
+    # In id order, like pipeline flushes, before the UPDATE (which has none)
+    db.execute(rebuilt.order_by(Budget.id).with_for_update(key_share=True))
+    budgets = Budget.__table__
+    db.execute(
+        budgets.update()
+        .where(budgets.c.id.in_(rebuilt))
+        .values(generation=budgets.c.generation + 1)
+    )
+
+    clear = delete(BudgetPeriod)
+    start = period_start_of(Budget.period, Transaction.date)
+    spent = (
+        select(Budget.id.label("budget_id"), Budget.period, start.label("period_start"), Transaction.amount)
+        .join(
+            Transaction,
+            and_(
+                Transaction.user_id == Budget.user_id,
+                Transaction.category_id == Budget.category_id,
+                Transaction.is_income == False,
+            ),
+        )
+    )
+    if budget_id is not None:
+        clear = clear.where(BudgetPeriod.budget_id == budget_id)
+        spent = spent.where(Budget.id == budget_id)
+    if user_id is not None:
+        clear = clear.where(
+            BudgetPeriod.budget_id.in_(select(Budget.id).where(Budget.user_id == user_id))
+        )
+        spent = spent.where(Budget.user_id == user_id)
+    spent = spent.subquery()
+
+    db.execute(clear)
+    db.execute(
+        pg_insert(BudgetPeriod).from_select(
+            ["budget_id", "period_start", "period_end", "spent"],
+            select(
+                spent.c.budget_id,
+                spent.c.period_start,
+                period_end_of(spent.c.period, spent.c.period_start),
+                func.sum(spent.c.amount),
+            ).group_by(spent.c.budget_id, spent.c.period, spent.c.period_start),
+        )
+    )
+
+
+def rebase_budget_counters(db) -> None:
+    """
+    Points the counters and account links of every budget at the current
+    period: from budget_periods and from the period's transactions. Call
+    right after rebuild_budget_periods, whose locks keep queued deltas
+    from being counted on top. Does not commit.
+    """
+    today = date.today()
+    spent = func.coalesce(
+        select(BudgetPeriod.spent).where(current_period_row(today)).scalar_subquery(), 0
+    )
+    rebase_budgets = Budget.__table__.update().values(
+        current_spent=spent, remaining=Budget.target_amount - spent
+    )
+
+    start, end = current_period_window(Budget.period, today)
+    progress = (
+        select(func.coalesce(func.sum(Transaction.amount), 0))
+        .where(
+            Budget.id == AccountBudget.budget_id,
+            Transaction.account_id == AccountBudget.account_id,
+            Transaction.user_id == Budget.user_id,
+            Transaction.category_id == Budget.category_id,
+            Transaction.is_income == False,
+            Transaction.date >= start,
+            Transaction.date < end,
+        )
+        .scalar_subquery()
+    )
+    rebase_links = AccountBudget.__table__.update().values(current_progress=progress)
+
+    db.execute(rebase_budgets)
+    db.execute(rebase_links)
+
+
+def current_period_spent(db, budget: Budget, today: date):
+    """The budget's current [start, end) window and what was spent in it."""
+    start, end = period_window(budget.period, today)
+    spent = db.execute(
+        select(BudgetPeriod.spent).where(
+            BudgetPeriod.budget_id == budget.id,
+            BudgetPeriod.period_start == start,
+        )
+    ).scalar()
+    return start, end, spent or 0
+
+
+def link_account_budgets(db, budget_id=None, account_id=None) -> None:
+    """
+    Creates the missing AccountBudget rows between a budget and every
+    account of its user, or an account and every budget of its user, with
+    one INSERT ... SELECT. current_progress starts at what the account has
+    already spent in the budget's current period. Does not commit.
+    """
+    start, end = current_period_window(Budget.period, date.today())
+    pairs = (
+        select(
+            Account.id,
+            Budget.id,
+            func.coalesce(func.sum(Transaction.amount), 0),
+        )
+        .join(Account, Account.user_id == Budget.user_id)
+        .outerjoin(
+            Transaction,
+            and_(
+                Transaction.account_id == Account.id,
+                Transaction.category_id == Budget.category_id,
+                Transaction.is_income == False,
+                Transaction.date >= start,
+                Transaction.date < end,
+            ),
+        )
+        .where(
+            ~select(AccountBudget.id)
+            .where(AccountBudget.account_id == Account.id, AccountBudget.budget_id == Budget.id)
+            .exists()
+        )
+        .group_by(Account.id, Budget.id)
+    )
+    if budget_id is not None:
+        pairs = pairs.where(Budget.id == budget_id)
+    if account_id is not None:
+        pairs = pairs.where(Account.id == account_id)
 
-    # Update per-account progress
-    acc_budget = db.query(AccountBudget).filter(
-        AccountBudget.account_id == transaction.account_id,
-        AccountBudget.budget_id == budget.id
-    ).first()
+    db.execute(
+        AccountBudget.__table__.insert().from_select(
+            ["account_id", "budget_id", "current_progress"], pairs
+        )
+    )
 
-    if acc_budget:
-        acc_budget.current_progress += float(transaction.amount)
 
-    db.commit()
-    db.refresh(budget)
+def refresh_budget(db, budget: Budget) -> None:
+    """
+    Rebuilds a new or re-targeted budget's period rows, points its counters
+    at the current period and relinks it to the user's accounts with
+    matching current_progress. Does not commit.
+    """
+    # Before flushing the budget row, which the flush would lock first
+    lock_users_for_rebuild(db, [budget.user_id])
+    db.flush()
+    rebuild_budget_periods(db, budget.id)
+    _start, _end, spent = current_period_spent(db, budget, date.today())
+    budget.current_spent = spent
+    budget.remaining = budget.target_amount - spent
 
+    db.execute(
+        delete(AccountBudget)
+        .where(AccountBudget.budget_id == budget.id)
+        .execution_options(synchronize_session=False)
+    )
+    link_account_budgets(db, budget_id=budget.id)
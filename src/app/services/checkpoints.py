@@ -0,0 +1,214 @@
+"""
+Month-end balance checkpoints for balance-as-of-date queries.
+
+balance_as_of reads the latest checkpoint on or before the date (one
+indexed lookup) and adds the transactions after it: at most one month.
+Missing month ends are filled in on demand by extend_checkpoints.
+
+Every transaction write goes through the ledger, which calls
+apply_checkpoint_deltas: a write dated `d` only shifts checkpoints with
+as_of >= d, so back-dated changes repair exactly the months after them.
+Rebuild from scratch with:
+
+    python -m src.app.services.checkpoints [--account-id ID]
+"""
+import argparse
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import Date, DateTime, bindparam, case, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from src.app.core.money import money_sum
+from src.app.db.database import NO_STATEMENT_TIMEOUT, SessionLocal
+from src.app.db.models.account import Account
+from src.app.db.models.balance_checkpoint import BalanceCheckpoint
+from src.app.db.models.transaction import Transaction
+from src.app.services.periods import month_window, sql_interval
+
+
+def month_end(day: date) -> date:
+    return month_window(day)[1] - timedelta(days=1)
+
+
+def checkpoint_deltas(entries) -> Dict[Tuple[int, date], int]:
+    """Folds ledger entries into {(account_id, month_end): balance delta}."""
+    deltas = defaultdict(int)
+    for entry in entries:
+        # Checkpoints sit on month ends, so as_of >= date <=> as_of >= its month end
+        deltas[(entry.account_id, month_end(entry.date))] += entry.balance_delta
+    return deltas
+
+
+def apply_checkpoint_deltas(db: Session, deltas: Dict[Tuple[int, date], int]) -> None:
+    rows = [
+        {"c_account_id": account_id, "c_as_of": as_of, "delta": delta}
+        for (account_id, as_of), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    # Core table UPDATE: executemany with a range predicate, not ORM by-PK
+    checkpoints = BalanceCheckpoint.__table__
+    db.execute(
+        checkpoints.update()
+        .where(
+            checkpoints.c.account_id == bindparam("c_account_id"),
+            checkpoints.c.as_of >= bindparam("c_as_of"),
+        )
+        .values(balance=checkpoints.c.balance + bindparam("delta")),
+        rows,
+    )
+
+
+def _latest_checkpoint(db: Session, account_id: int, day: date):
+    return db.execute(
+        select(BalanceCheckpoint.as_of, BalanceCheckpoint.balance)
+        .where(BalanceCheckpoint.account_id == account_id, BalanceCheckpoint.as_of <= day)
+        .order_by(BalanceCheckpoint.as_of.desc())
+        .limit(1)
+    ).first()
+
+
+def extend_checkpoints(db: Session, account_id: int, through: date) -> None:
+    """
+    Creates the missing month-end checkpoints of the account up to `through`
+    (a month end), continuing from its latest one. Does not commit.
+    """
+    # Writers hold this row lock while they shift checkpoints (the ledger
+    # takes it even when the balance itself does not change), so taking it
+    # first means no committed-but-unseen delta can be missed below. NO KEY
+    # UPDATE, like theirs, so foreign-key checks on account_id don't queue.
+    starting_balance = db.execute(
+        select(Account.starting_balance)
+        .where(Account.id == account_id)
+        .with_for_update(key_share=True)
+    ).scalar_one()
+
+    latest = _latest_checkpoint(db, account_id, through)
+    if latest is not None and latest.as_of >= through:
+        return
+
+    if latest is not None:
+        first_month, base = latest.as_of + timedelta(days=1), latest.balance
+    else:
+        first_txn = db.execute(
+            select(func.min(Transaction.date)).where(Transaction.account_id == account_id)
+        ).scalar()
+        first_month = min(first_txn or through, through).replace(day=1)
+        base = starting_balance
+
+    months = select(
+        cast(
+            func.generate_series(
+                cast(first_month, DateTime),
+                cast(through, DateTime),
+                sql_interval("1 month"),
+            ),
+            Date,
+        ).label("month")
+    ).subquery()
+
+    txn_month = cast(func.date_trunc("month", Transaction.date), Date)
+    signed = select(
+        txn_month.label("month"),
+        case(
+            (Transaction.is_income == True, Transaction.amount),
+            else_=-Transaction.amount,
+        ).label("amount"),
+    ).where(
+        Transaction.account_id == account_id,
+        Transaction.date >= first_month,
+        Transaction.date <= through,
+    ).subquery()
+    deltas = (
+        select(signed.c.month, func.sum(signed.c.amount).label("delta"))
+        .group_by(signed.c.month)
+        .subquery()
+    )
+
+    source = (
+        select(
+            bindparam("account_id", account_id),
+            cast(months.c.month + sql_interval("1 month") - sql_interval("1 day"), Date),
+            base + func.sum(func.coalesce(deltas.c.delta, 0)).over(order_by=months.c.month),
+        )
+        .select_from(months)
+        .outerjoin(deltas, deltas.c.month == months.c.month)
+    )
+    db.execute(
+        pg_insert(BalanceCheckpoint)
+        .from_select(["account_id", "as_of", "balance"], source)
+        .on_conflict_do_nothing(index_elements=["account_id", "as_of"])
+    )
+
+
+def balance_as_of(db: Session, account_id: int, day: date) -> int:
+    """
+    Balance of the account at the end of `day`, in cents. May create
+    checkpoints for months that have ended since the last call; does not
+    commit.
+    """
+    # Only months that are over get a checkpoint
+    through = min(month_window(day)[0], month_window(date.today())[0]) - timedelta(days=1)
+
+    latest = _latest_checkpoint(db, account_id, day)
+    if latest is None or latest.as_of < through:
+        extend_checkpoints(db, account_id, through)
+        latest = _latest_checkpoint(db, account_id, day)
+
+    if latest is not None:
+        base, after = latest.balance, latest.as_of
+    else:
+        base = db.execute(
+            select(Account.starting_balance).where(Account.id == account_id)
+        ).scalar_one()
+        after = None
+
+    tail = select(
+        money_sum(
+            case(
+                (Transaction.is_income == True, Transaction.amount),
+                else_=-Transaction.amount,
+            )
+        )
+    ).where(Transaction.account_id == account_id, Transaction.date <= day)
+    if after is not None:
+        tail = tail.where(Transaction.date > after)
+
+    return base + db.execute(tail).scalar()
+
+
+def rebuild_checkpoints(db: Session, account_id: Optional[int] = None) -> None:
+    """Recomputes checkpoints through last month for one account, or all. Does not commit."""
+    clear = delete(BalanceCheckpoint)
+    accounts = select(Account.id).order_by(Account.id)
+    if account_id is not None:
+        clear = clear.where(BalanceCheckpoint.account_id == account_id)
+        accounts = accounts.where(Account.id == account_id)
+
+    db.execute(clear)
+    through = month_window(date.today())[0] - timedelta(days=1)
+    for (account,) in db.execute(accounts).all():
+        extend_checkpoints(db, account, through)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild balance_checkpoints from transactions.")
+    parser.add_argument("--account-id", type=int, default=None, help="only rebuild this account")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        db.execute(NO_STATEMENT_TIMEOUT)
+        rebuild_checkpoints(db, args.account_id)
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Idempotency-Key support for write endpoints.
+
+The first request with a given key stores its response in idempotency_keys
+inside the same database transaction as the write itself. Retries with the
+same key get that stored response back without running the write again.
+A small in-process LRU sits in front of the table so hot retries skip the
+database entirely; rows expire after IDEMPOTENCY_TTL and are purged lazily.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.app.db.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_TTL = timedelta(hours=24)
+LRU_MAX_ENTRIES = 10_000
+PURGE_EVERY_SAVES = 500
+
+
+def hash_body(body) -> str:
+    """Stable fingerprint of a JSON-able request body."""
+    raw = json.dumps(body, sort_keys=True, default=str).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, ttl: timedelta = IDEMPOTENCY_TTL, max_entries: int = LRU_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._saves = 0
+
+    def _check(self, stored_hash: str, request_hash: str) -> None:
+        if stored_hash != request_hash:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                "Idempotency-Key was already used with a different request body",
+            )
+
+    def lookup(
+        self, db: Session, user_id: int, endpoint: str, key: str, request_hash: str
+    ) -> Optional[dict]:
+        """Returns the stored response for a replayed key, or None."""
+        cache_key = (user_id, endpoint, key)
+        now = datetime.now(timezone.utc)
+
+        with self._lock:
+            cached = self._lru.get(cache_key)
+            if cached is not None:
+                if cached[2] > now:
+                    self._lru.move_to_end(cache_key)
+                    self._check(cached[0], request_hash)
+                    return cached[1]
+                del self._lru[cache_key]
+
+        row = (
+            db.query(IdempotencyKey.request_hash, IdempotencyKey.response, IdempotencyKey.expires_at)
+            .filter(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.endpoint == endpoint,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at > now,
+            )
+            .first()
+        )
+        if row is None:
+            return None
+
+        self.remember(user_id, endpoint, key, row.request_hash, row.response, row.expires_at)
+        self._check(row.request_hash, request_hash)
+        return row.response
+
+    def save(
+        self, db: Session, user_id: int, endpoint: str, key: str, request_hash: str, response: dict
+    ) -> datetime:
+        """
+        Stages the response row in the caller's unit of work and returns its
+        expiry. Call remember() once the caller has committed.
+        """
+        now = datetime.now(timezone.utc)
+        expires_at = now + self.ttl
+
+        # An expired row for the key may still be waiting for the purge; it
+        # would make the insert below fail the unique constraint
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.endpoint == endpoint,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at <= now,
+            )
+        )
+        db.add(IdempotencyKey(
+            key=key,
+            user_id=user_id,
+            endpoint=endpoint,
+            request_hash=request_hash,
+            response=response,
+            expires_at=expires_at,
+        ))
+
+        with self._lock:
+            self._saves += 1
+            purge = self._saves % PURGE_EVERY_SAVES == 0
+        if purge:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+
+        return expires_at
+
+    def commit(
+        self, db: Session, user_id: int, endpoint: str, key: str, request_hash: str, response: dict
+    ) -> dict:
+        """
+        Commits the caller's unit of work together with the stored response
+        and returns the response to send. If a concurrent request with the
+        same key committed first, its write wins and its response is returned.
+        """
+        expires_at = self.save(db, user_id, endpoint, key, request_hash, response)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            replay = self.lookup(db, user_id, endpoint, key, request_hash)
+            if replay is None:
+                raise
+            return replay
+
+        self.remember(user_id, endpoint, key, request_hash, response, expires_at)
+        return response
+
+    def remember(
+        self, user_id: int, endpoint: str, key: str, request_hash: str, response: dict, expires_at: datetime
+    ) -> None:
+        with self._lock:
+            self._lru[(user_id, endpoint, key)] = (request_hash, response, expires_at)
+            self._lru.move_to_end((user_id, endpoint, key))
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,120 @@
+"""
+Balance, budget, rollup and checkpoint bookkeeping for transaction writes.
+
+Write paths describe what they did as LedgerEntry rows (sign=+1 for a
+transaction that now exists, sign=-1 for one that was removed or replaced)
+and hand them to apply_entries, which folds them into one delta per account,
+monthly rollup bucket and balance checkpoint range and writes those as
+atomic `x = x + delta` UPDATEs, so concurrent writers to the same account
+never lose each other's changes. Budget deltas are resolved to budgets and
+queued for the write-behind pipeline in services/budget_pipeline.py instead.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from src.app.db.models.account import Account
+from src.app.services.budget_pipeline import enqueue_on_commit
+from src.app.services.budget_progress import resolve_budget_deltas
+from src.app.services.checkpoints import apply_checkpoint_deltas, checkpoint_deltas
+from src.app.services.response_cache import invalidate_on_commit
+from src.app.services.rollups import apply_rollup_deltas, rollup_deltas
+
+
+class LedgerEntry(NamedTuple):
+    user_id: int
+    account_id: int
+    category_id: Optional[int]
+    date: date
+    amount: int  # cents
+    is_income: bool
+    sign: int = 1
+
+    @property
+    def balance_delta(self) -> int:
+        # Income adds to the account, expenses take from it
+        return self.sign * (self.amount if self.is_income else -self.amount)
+
+
+def entry_for(transaction, sign: int = 1) -> LedgerEntry:
+    return LedgerEntry(
+        user_id=transaction.user_id,
+        account_id=transaction.account_id,
+        category_id=transaction.category_id,
+        date=transaction.date,
+        amount=transaction.amount,
+        is_income=transaction.is_income,
+        sign=sign,
+    )
+
+
+def apply_balance_deltas(db: Session, deltas: Dict[int, int]) -> None:
+    rows = [
+        {"b_account_id": account_id, "delta": delta}
+        # Sorted so concurrent writers take row locks in the same order
+        for account_id, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    accounts = Account.__table__
+    db.execute(
+        accounts.update()
+        .where(accounts.c.id == bindparam("b_account_id"))
+        .values(current_balance=accounts.c.current_balance + bindparam("delta")),
+        rows,
+    )
+
+
+def lock_accounts(db: Session, account_ids) -> None:
+    # FOR NO KEY UPDATE, the balance UPDATE's own lock mode: it does not
+    # block the KEY SHARE locks of foreign-key checks on account_id.
+    # Ordered by id, the same lock order as apply_balance_deltas.
+    db.execute(
+        select(Account.id)
+        .where(Account.id.in_(account_ids))
+        .order_by(Account.id)
+        .with_for_update(key_share=True)
+    )
+
+
+def apply_entries(db: Session, entries: Iterable[LedgerEntry]) -> None:
+    """
+    Applies the net balance, checkpoint and monthly-rollup effect of
+    `entries` and queues their budget effect for after the commit.
+    Does not commit; the caller owns the unit of work.
+    """
+    entries = list(entries)
+    balance_deltas = defaultdict(int)
+    budget_deltas = defaultdict(int)
+
+    for entry in entries:
+        balance_deltas[entry.account_id] += entry.balance_delta
+
+        # Only expenses count towards budgets
+        if not entry.is_income and entry.category_id is not None:
+            key = (entry.user_id, entry.category_id, entry.account_id, entry.date)
+            budget_deltas[key] += entry.sign * entry.amount
+
+    # Checkpoints may only shift under the account row lock (see
+    # checkpoints.extend_checkpoints). The balance UPDATE takes it, except
+    # where the net change is 0, e.g. a transaction moved to another month;
+    # then every touched account is locked up front, still in id order.
+    shifts = checkpoint_deltas(entries)
+    shifted = {account_id for (account_id, _), delta in shifts.items() if delta}
+    if shifted - {account_id for account_id, delta in balance_deltas.items() if delta}:
+        lock_accounts(db, shifted | set(balance_deltas))
+
+    apply_balance_deltas(db, balance_deltas)
+    apply_checkpoint_deltas(db, shifts)
+    # Budget progress is write-behind: resolved to budgets here, applied after commit
+    enqueue_on_commit(db, resolve_budget_deltas(db, budget_deltas))
+    apply_rollup_deltas(db, rollup_deltas(entries))
+
+    # Cached dashboards/summaries of these users go stale on commit
+    for user_id in {entry.user_id for entry in entries}:
+        invalidate_on_commit(db, user_id)
@@ -0,0 +1,52 @@
+"""
+Half-open [start, end) date windows for months and budget periods.
+
+Queries filter with `date >= start AND date < end`, which an index on
+date can serve (unlike extract()/date_trunc() on the column).
+"""
+from datetime import date, timedelta
+from typing import Tuple
+
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import INTERVAL
+
+# Budget.period values and the window each one covers
+BUDGET_PERIODS = ("weekly", "monthly", "yearly")
+
+# Postgres date_trunc() field and interval length of each budget period
+PERIOD_UNITS = {"weekly": "week", "monthly": "month", "yearly": "year"}
+
+
+def month_window(day: date) -> Tuple[date, date]:
+    start = day.replace(day=1)
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+
+def trailing_months_window(day: date, months: int) -> Tuple[date, date]:
+    """The `months` calendar months ending with the one containing `day`."""
+    index = day.year * 12 + day.month - 1 - (months - 1)
+    start = date(index // 12, index % 12 + 1, 1)
+    return start, month_window(day)[1]
+
+
+def period_window(period: str, day: date) -> Tuple[date, date]:
+    """
+    Window of the given budget period containing `day`. Weeks start on
+    Monday (like Postgres date_trunc('week')); unknown periods are monthly.
+    """
+    if period == "weekly":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    if period == "yearly":
+        return date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    return month_window(day)
+
+
+def sql_interval(length: str):
+    """
+    SQL interval literal such as interval '1 month'. Inlined rather than
+    bound, since asyncpg will not send a str parameter as an interval;
+    `length` comes from constants like PERIOD_UNITS, never from requests.
+    """
+    return literal_column(f"interval '{length}'", INTERVAL)
@@ -0,0 +1,188 @@
+"""
+Rebuilds budget progress from transactions and reports what had drifted.
+
+    python -m src.app.services.reconcile [--user-id ID] [--workers N] [--dry-run]
+
+Per user, in one database transaction: budget_periods rows are rebuilt,
+then Budget.current_spent/remaining and AccountBudget.current_progress are
+recomputed for each budget's current period with grouped SQL and only the
+rows that differ are written. Users are independent shards, reconciled in
+parallel on a thread pool with one session each.
+
+The rebuild locks the user's row, waiting for in-flight writes, and bumps
+the budgets' generation, so deltas still queued in any process's pipeline
+are dropped rather than counted on top (services/budget_progress.py).
+Budget rows are locked before budget_periods and account_budgets, the
+pipeline's order, so reconciling next to live flushes does not deadlock.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import and_, bindparam, select
+from sqlalchemy.orm import Session
+
+from src.app.core.money import format_dollars, money_sum
+from src.app.db.database import NO_STATEMENT_TIMEOUT, SessionLocal
+from src.app.db.models.account_budget import AccountBudget
+from src.app.db.models.budget import Budget
+from src.app.db.models.transaction import Transaction
+from src.app.services.budget_progress import current_period_window, rebuild_budget_periods
+
+
+def _expected_spent(user_id: int, today: date, per_account: bool):
+    """Current-period spend per budget, or per account-budget link."""
+    start, end = current_period_window(Budget.period, today)
+    matches = and_(
+        Transaction.user_id == Budget.user_id,
+        Transaction.category_id == Budget.category_id,
+        Transaction.is_income == False,
+        Transaction.date >= start,
+        Transaction.date < end,
+    )
+
+    if per_account:
+        return (
+            select(AccountBudget.id, money_sum(Transaction.amount).label("spent"))
+            .join(Budget, Budget.id == AccountBudget.budget_id)
+            .outerjoin(Transaction, and_(matches, Transaction.account_id == AccountBudget.account_id))
+            .where(Budget.user_id == user_id)
+            .group_by(AccountBudget.id)
+            .subquery()
+        )
+
+    return (
+        select(Budget.id, money_sum(Transaction.amount).label("spent"))
+        .outerjoin(Transaction, matches)
+        .where(Budget.user_id == user_id)
+        .group_by(Budget.id)
+        .subquery()
+    )
+
+
+def reconcile_user(db: Session, user_id: int, today: Optional[date] = None) -> List[dict]:
+    """
+    Reconciles one user's budgets and returns a drift record (amounts in
+    cents) per row that was corrected. Does not commit.
+    """
+    today = today or date.today()
+    rebuild_budget_periods(db, user_id=user_id)
+
+    # Writes of this user wait on the rebuild's lock until the commit, so
+    # the sums below are final; these locks keep pipeline flushes out too
+    db.execute(select(Budget.id).where(Budget.user_id == user_id).with_for_update())
+    db.execute(
+        select(AccountBudget.id)
+        .join(Budget, Budget.id == AccountBudget.budget_id)
+        .where(Budget.user_id == user_id)
+        .with_for_update(of=AccountBudget)
+    )
+
+    drift = []
+
+    expected = _expected_spent(user_id, today, per_account=False)
+    budget_rows = db.execute(
+        select(Budget.id, Budget.current_spent, Budget.remaining, Budget.target_amount, expected.c.spent)
+        .join(expected, expected.c.id == Budget.id)
+        .where(
+            (Budget.current_spent != expected.c.spent)
+            | (Budget.remaining != Budget.target_amount - expected.c.spent)
+        )
+        .order_by(Budget.id)
+    ).all()
+    if budget_rows:
+        budgets = Budget.__table__
+        db.execute(
+            budgets.update()
+            .where(budgets.c.id == bindparam("b_id"))
+            .values(current_spent=bindparam("spent"), remaining=bindparam("remaining")),
+            [
+                {"b_id": r.id, "spent": r.spent, "remaining": r.target_amount - r.spent}
+                for r in budget_rows
+            ],
+        )
+        drift += [
+            {
+                "table": "budgets",
+                "id": r.id,
+                "user_id": user_id,
+                "was": r.current_spent,
+                "now": r.spent,
+            }
+            for r in budget_rows
+        ]
+
+    expected = _expected_spent(user_id, today, per_account=True)
+    link_rows = db.execute(
+        select(AccountBudget.id, AccountBudget.current_progress, expected.c.spent)
+        .join(expected, expected.c.id == AccountBudget.id)
+        .where(AccountBudget.current_progress != expected.c.spent)
+        .order_by(AccountBudget.id)
+    ).all()
+    if link_rows:
+        account_budgets = AccountBudget.__table__
+        db.execute(
+            account_budgets.update()
+            .where(account_budgets.c.id == bindparam("b_id"))
+            .values(current_progress=bindparam("spent")),
+            [{"b_id": r.id, "spent": r.spent} for r in link_rows],
+        )
+        drift += [
+            {
+                "table": "account_budgets",
+                "id": r.id,
+                "user_id": user_id,
+                "was": r.current_progress,
+                "now": r.spent,
+            }
+            for r in link_rows
+        ]
+
+    return drift
+
+
+def reconcile(
+    session_factory, user_ids: Optional[List[int]] = None, workers: int = 4, dry_run: bool = False
+) -> List[dict]:
+    """Reconciles the given users (default: everyone with a budget) in parallel."""
+    if user_ids is None:
+        with session_factory() as db:
+            user_ids = db.scalars(select(Budget.user_id).distinct().order_by(Budget.user_id)).all()
+
+    today = date.today()
+
+    def run(user_id: int) -> List[dict]:
+        with session_factory() as db:
+            # Rebuilding a big user's periods can outlast the API's timeout
+            db.execute(NO_STATEMENT_TIMEOUT)
+            drift = reconcile_user(db, user_id, today)
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+            return drift
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return [row for drift in pool.map(run, user_ids) for row in drift]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild budget progress counters from transactions.")
+    parser.add_argument("--user-id", type=int, action="append", help="only these users (repeatable)")
+    parser.add_argument("--workers", type=int, default=4, help="users reconciled in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without fixing it")
+    args = parser.parse_args()
+
+    drift = reconcile(SessionLocal, args.user_id, args.workers, args.dry_run)
+    for row in drift:
+        print(
+            f"{row['table']} id={row['id']} user={row['user_id']}: "
+            f"{format_dollars(row['was'])} -> {format_dollars(row['now'])}"
+        )
+    action = "found" if args.dry_run else "fixed"
+    print(f"{len(drift)} drifted row(s) {action}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Per-user in-process cache for read-heavy dashboard and summary responses.
+
+Entries are keyed by (user_id, endpoint, params), bounded by an LRU and
+expire after RESPONSE_CACHE_TTL. Writes call invalidate_on_commit(db, user_id)
+and that user's entries are dropped once the session actually commits, so a
+rolled-back write never evicts anything and a committed one is visible on
+the next read.
+
+A per-user generation counter guards the race where a read computed from
+pre-commit data finishes after the invalidation: its result is not stored.
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.app.db.database import pin_reads_on_commit
+
+RESPONSE_CACHE_TTL = 60.0  # seconds
+RESPONSE_CACHE_MAX_ENTRIES = 2_000
+
+_DIRTY_USERS = "response_cache_dirty_users"
+_MISSING = object()
+
+
+class ResponseCache:
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._by_user = defaultdict(set)
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def _drop(self, key: Tuple) -> None:
+        del self._entries[key]
+        user_keys = self._by_user[key[0]]
+        user_keys.discard(key)
+        if not user_keys:
+            del self._by_user[key[0]]
+
+    def get(self, key: Tuple) -> Any:
+        """Returns the cached value, or _MISSING."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return cached[1]
+                self._drop(key)
+            self.misses += 1
+            return _MISSING
+
+    def generation(self, user_id: int) -> int:
+        with self._lock:
+            return self._generations[user_id]
+
+    def put(self, key: Tuple, value: Any, generation: int) -> None:
+        user_id = key[0]
+        with self._lock:
+            # The user wrote something while this value was being computed
+            if self._generations[user_id] != generation:
+                return
+
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._by_user[user_id].add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._generations[user_id] += 1
+            for key in self._by_user.pop(user_id, ()):
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self._generations.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(endpoint: str) -> Callable:
+    """
+    Caches a route's return value per (user_id, endpoint, params).
+
+    The route must take a `user_id` argument; the `db` session is not part
+    of the key. functools.wraps keeps the signature FastAPI inspects.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            user_id = kwargs["user_id"]
+            params = tuple(sorted(
+                (name, value) for name, value in kwargs.items()
+                if name not in ("db", "user_id")
+            ))
+            key = (user_id, endpoint, params)
+
+            value = response_cache.get(key)
+            if value is not _MISSING:
+                return value
+
+            generation = response_cache.generation(user_id)
+            value = func(*args, **kwargs)
+            response_cache.put(key, value, generation)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_on_commit(db: Session, user_id: Optional[int]) -> None:
+    """
+    Drops user_id's cached responses once db's current transaction commits,
+    and keeps their reads on the primary until the replica has caught up.
+    """
+    if user_id is not None:
+        db.info.setdefault(_DIRTY_USERS, set()).add(user_id)
+        pin_reads_on_commit(db, user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for user_id in session.info.pop(_DIRTY_USERS, ()):
+        response_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session) -> None:
+    session.info.pop(_DIRTY_USERS, None)
@@ -0,0 +1,148 @@
+"""
+Monthly rollups: income/expense/count per (user, month, category, account).
+
+apply_rollup_deltas is called by the ledger for every transaction write, so
+summaries and dashboards read O(months x categories) rollup rows instead of
+raw transactions. Rebuild from scratch (e.g. after a backfill) with:
+
+    python -m src.app.services.rollups [--user-id ID]
+"""
+import argparse
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import Date, case, cast, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from src.app.db.database import NO_STATEMENT_TIMEOUT, SessionLocal
+from src.app.db.models.monthly_rollup import MonthlyRollup, ROLLUP_KEY
+from src.app.db.models.transaction import Transaction
+
+
+def rollup_deltas(entries) -> Dict[Tuple, list]:
+    """Folds ledger entries into {(user, month, category, account): [income, expense, count]}."""
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for entry in entries:
+        key = (entry.user_id, entry.date.replace(day=1), entry.category_id, entry.account_id)
+        totals = deltas[key]
+        totals[0 if entry.is_income else 1] += entry.sign * entry.amount
+        totals[2] += entry.sign
+    return deltas
+
+
+def apply_rollup_deltas(db: Session, deltas: Dict[Tuple, list]) -> None:
+    rows = [
+        {
+            "user_id": user_id,
+            "month": month,
+            "category_id": category_id,
+            "account_id": account_id,
+            "income": income,
+            "expense": expense,
+            "transaction_count": count,
+        }
+        # Sorted so concurrent writers lock rollup rows in the same order
+        for (user_id, month, category_id, account_id), (income, expense, count) in sorted(
+            deltas.items(), key=lambda item: (item[0][0], item[0][1], item[0][2] or 0, item[0][3])
+        )
+        if income or expense or count
+    ]
+    if not rows:
+        return
+
+    stmt = pg_insert(MonthlyRollup).values(rows)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={
+                "income": MonthlyRollup.income + stmt.excluded.income,
+                "expense": MonthlyRollup.expense + stmt.excluded.expense,
+                "transaction_count": MonthlyRollup.transaction_count + stmt.excluded.transaction_count,
+            },
+        )
+    )
+
+    # Drop buckets whose last transaction went away
+    db.execute(
+        delete(MonthlyRollup).where(
+            MonthlyRollup.user_id.in_({row["user_id"] for row in rows}),
+            MonthlyRollup.transaction_count == 0,
+        )
+    )
+
+
+def uncategorize_rollups(db: Session, category_id: int) -> None:
+    """
+    Folds a category's rollups into the uncategorized (NULL category) buckets,
+    matching what deleting the category does to its transactions. Call before
+    deleting it, with the category row locked so no writer adds to it meanwhile.
+    """
+    source = select(
+        MonthlyRollup.user_id,
+        MonthlyRollup.month,
+        MonthlyRollup.account_id,
+        MonthlyRollup.income,
+        MonthlyRollup.expense,
+        MonthlyRollup.transaction_count,
+    ).where(MonthlyRollup.category_id == category_id)
+
+    stmt = pg_insert(MonthlyRollup).from_select(
+        ["user_id", "month", "account_id", "income", "expense", "transaction_count"], source
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={
+                "income": MonthlyRollup.income + stmt.excluded.income,
+                "expense": MonthlyRollup.expense + stmt.excluded.expense,
+                "transaction_count": MonthlyRollup.transaction_count + stmt.excluded.transaction_count,
+            },
+        )
+    )
+    db.execute(delete(MonthlyRollup).where(MonthlyRollup.category_id == category_id))
+
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None) -> None:
+    """Recomputes rollups from transactions for one user, or everyone. Does not commit."""
+    clear = delete(MonthlyRollup)
+    month = cast(func.date_trunc("month", Transaction.date), Date)
+    source = select(
+        Transaction.user_id,
+        month,
+        Transaction.category_id,
+        Transaction.account_id,
+        func.sum(case((Transaction.is_income == True, Transaction.amount), else_=0)),
+        func.sum(case((Transaction.is_income == False, Transaction.amount), else_=0)),
+        func.count(),
+    ).group_by(Transaction.user_id, month, Transaction.category_id, Transaction.account_id)
+
+    if user_id is not None:
+        clear = clear.where(MonthlyRollup.user_id == user_id)
+        source = source.where(Transaction.user_id == user_id)
+
+    db.execute(clear)
+    db.execute(
+        insert(MonthlyRollup).from_select(
+            ["user_id", "month", "category_id", "account_id", "income", "expense", "transaction_count"],
+            source,
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild monthly_rollups from transactions.")
+    parser.add_argument("--user-id", type=int, default=None, help="only rebuild this user")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        db.execute(NO_STATEMENT_TIMEOUT)
+        rebuild_rollups(db, args.user_id)
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Bulk transaction import.
+
+Rows are validated one at a time and written in batches of BATCH_SIZE:
+one multi-row INSERT per batch, followed by a single balance/budget pass
+for the whole batch (see ledger.apply_entries).
+"""
+import csv
+import io
+import json
+import re
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from src.app.db.models.account import Account
+from src.app.db.models.category import Category
+from src.app.db.models.transaction import Transaction
+from src.app.api.schemas.transaction import TransactionImportRow
+from src.app.services.ledger import LedgerEntry, apply_entries
+
+BATCH_SIZE = 1000
+READ_SIZE = 64 * 1024
+# A single JSON row longer than this is rejected rather than buffered
+MAX_JSON_ROW_CHARS = 1024 * 1024
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class TransactionImportError(ValueError):
+    """Raised when the upload (or one of its rows) cannot be imported."""
+
+
+def iter_csv_rows(stream) -> Iterator[dict]:
+    """
+    Yields dicts from a binary CSV stream with a header row
+    (date, amount, description, is_income, account_id, category_id).
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    for row in reader:
+        # Empty CSV cells mean "not given", not the empty string
+        yield {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def iter_json_rows(stream) -> Iterator[dict]:
+    """
+    Yields dicts from a binary stream holding a JSON array of rows.
+
+    The array is decoded one row at a time, so memory holds the row being
+    parsed and one READ_SIZE chunk, never the whole upload.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+
+    def fill() -> bool:
+        # Drops what has been parsed already; False at the end of the stream
+        nonlocal buffer, pos
+        try:
+            chunk = text.read(READ_SIZE)
+        except UnicodeDecodeError as exc:
+            raise TransactionImportError(f"Invalid JSON: {exc}") from exc
+        if not chunk:
+            return False
+        if len(buffer) - pos > MAX_JSON_ROW_CHARS:
+            raise TransactionImportError(
+                f"Invalid JSON: a row is longer than {MAX_JSON_ROW_CHARS} characters"
+            )
+        buffer, pos = buffer[pos:] + chunk, 0
+        return True
+
+    def peek() -> str:
+        # The next character after any whitespace, "" at the end of the stream
+        nonlocal pos
+        while True:
+            pos = _JSON_WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or not fill():
+                return buffer[pos:pos + 1]
+
+    if peek() != "[":
+        raise TransactionImportError("Expected a JSON array of transactions")
+    pos += 1
+
+    row_number = 0
+    separator = peek()
+    while separator != "]":
+        row_number += 1
+        while True:
+            try:
+                row, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as exc:
+                if fill():
+                    continue
+                raise TransactionImportError(f"Row {row_number}: invalid JSON: {exc.msg}") from exc
+            # A number running up to the end of the chunk may go on in the next one
+            if end < len(buffer) or not fill():
+                break
+        pos = end
+        yield row
+
+        separator = peek()
+        if separator == ",":
+            pos += 1
+            if peek() == "]":
+                raise TransactionImportError(f"Row {row_number}: invalid JSON: trailing comma")
+        elif separator != "]":
+            raise TransactionImportError(
+                f"Row {row_number}: invalid JSON: expected ',' or ']' after the row"
+            )
+    pos += 1
+
+    if peek():
+        raise TransactionImportError("Invalid JSON: extra data after the array")
+
+
+def _batches(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_transactions(db: Session, user_id: int, rows: Iterable[dict]) -> int:
+    """
+    Validates and inserts `rows` for `user_id`, returning how many were
+    imported. Does not commit; the caller commits the whole import at once.
+    """
+    account_ids = {
+        account_id
+        for (account_id,) in db.query(Account.id).filter(Account.user_id == user_id)
+    }
+    category_ids = {
+        category_id
+        for (category_id,) in db.query(Category.id).filter(Category.user_id == user_id)
+    }
+
+    imported = 0
+    for batch in _batches(enumerate(rows, start=1), BATCH_SIZE):
+        values = []
+        entries = []
+
+        for row_number, raw in batch:
+            try:
+                row = TransactionImportRow.model_validate(raw)
+            except ValidationError as exc:
+                raise TransactionImportError(f"Row {row_number}: {exc}") from exc
+
+            if row.account_id not in account_ids:
+                raise TransactionImportError(
+                    f"Row {row_number}: account {row.account_id} not found"
+                )
+            if row.category_id is not None and row.category_id not in category_ids:
+                raise TransactionImportError(
+                    f"Row {row_number}: category {row.category_id} not found"
+                )
+
+            values.append({**row.model_dump(), "user_id": user_id})
+            entries.append(
+                LedgerEntry(
+                    user_id=user_id,
+                    account_id=row.account_id,
+                    category_id=row.category_id,
+                    date=row.date,
+                    amount=row.amount,
+                    is_income=row.is_income,
+                )
+            )
+
+        db.execute(insert(Transaction), values)
+        apply_entries(db, entries)
+        imported += len(values)
+
+    return imported
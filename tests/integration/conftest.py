@@ -0,0 +1,104 @@
+"""
+Integration tests run the app against a real Postgres database:
+
+    TEST_DATABASE_URL=postgresql+psycopg2://user:pw@localhost/pf_test python -m pytest tests
+
+The database is scratch: its tables are dropped and recreated once per run
+and emptied after every test. Without TEST_DATABASE_URL these tests are
+skipped.
+"""
+import os
+from contextlib import contextmanager
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    # Must happen before src.app.core.config reads the environment
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ.pop("DATABASE_REPLICA_URL", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from src.app.db.base import Base  # noqa: E402
+from src.app.db.database import engine  # noqa: E402
+from src.app.db.init_db import init_db  # noqa: E402
+from src.app.main import app  # noqa: E402
+from src.app.services.budget_pipeline import budget_pipeline  # noqa: E402
+from src.app.services.response_cache import response_cache  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def database():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def empty_tables(database):
+    yield
+    budget_pipeline.flush()
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    with database.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    response_cache.clear()
+
+
+@pytest.fixture
+def client(database, monkeypatch):
+    # Every request should reach the database
+    monkeypatch.setattr(response_cache, "ttl", 0)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def recorded_statements(database):
+    """
+    Context manager collecting (statement, parameters) for every statement
+    the app's engine sends while it is open.
+    """
+    @contextmanager
+    def record():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        # Queued budget progress would otherwise be flushed mid-recording
+        budget_pipeline.flush()
+        event.listen(database, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(database, "before_cursor_execute", before_cursor_execute)
+
+    return record
+
+
+@pytest.fixture
+def make_user(client):
+    """Creates a user with one checking account and one expense category."""
+    def make(name: str) -> dict:
+        user = client.post(
+            "/auth/signup",
+            json={"username": name, "email": f"{name}@example.com", "password": "secret"},
+        ).json()
+        account = client.post(
+            "/accounts/",
+            json={"name": "Checking", "type": "checking", "user_id": user["id"], "starting_balance": 0},
+        ).json()
+        category = client.post(
+            "/categories/",
+            json={"name": "Groceries", "type": "expense", "user_id": user["id"]},
+        ).json()
+        return {"id": user["id"], "account_id": account["id"], "category_id": category["id"]}
+
+    return make
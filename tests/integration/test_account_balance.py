@@ -0,0 +1,73 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from src.app.db.database import SessionLocal
+from src.app.db.models.balance_checkpoint import BalanceCheckpoint
+
+
+def add_transaction(client, user: dict, account_id: int, amount: float, day: str, is_income=False) -> dict:
+    response = client.post(
+        "/transactions/",
+        json={
+            "amount": amount,
+            "date": day,
+            "is_income": is_income,
+            "user_id": user["id"],
+            "account_id": account_id,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def balance(client, account_id: int, as_of: str) -> float:
+    response = client.get(f"/accounts/{account_id}/balance", params={"as_of": as_of})
+    assert response.status_code == 200
+    return response.json()["balance"]
+
+
+def checkpoints(account_id: int) -> list:
+    with SessionLocal() as db:
+        return [
+            (row.as_of, row.balance)
+            for row in db.execute(
+                select(BalanceCheckpoint)
+                .where(BalanceCheckpoint.account_id == account_id)
+                .order_by(BalanceCheckpoint.as_of)
+            ).scalars()
+        ]
+
+
+def test_balance_as_of_follows_writes_around_checkpoints(client, make_user):
+    user = make_user("balances")
+    account = client.post(
+        "/accounts/",
+        json={"name": "Savings", "type": "savings", "user_id": user["id"], "starting_balance": 100},
+    ).json()
+
+    add_transaction(client, user, account["id"], 500, "2026-06-15", is_income=True)
+    rent = add_transaction(client, user, account["id"], 120.25, "2026-07-01")
+    add_transaction(client, user, account["id"], 30, "2026-08-31")
+
+    assert balance(client, account["id"], "2026-05-31") == 100.0
+    assert balance(client, account["id"], "2026-06-30") == 600.0
+    assert balance(client, account["id"], "2026-07-01") == 479.75
+    assert balance(client, account["id"], "2026-09-10") == 449.75
+    # Month ends up to the one before as_of now have checkpoints
+    assert checkpoints(account["id"])[-1] == (date(2026, 8, 31), 44975)
+
+    # Back-dated writes move the checkpoints after them
+    add_transaction(client, user, account["id"], 50, "2026-06-20")
+    assert client.patch(f"/transactions/{rent['id']}", json={"amount": 100}).status_code == 200
+    assert balance(client, account["id"], "2026-06-30") == 550.0
+    assert balance(client, account["id"], "2026-07-31") == 450.0
+    assert balance(client, account["id"], "2026-09-10") == 420.0
+
+    assert client.delete(f"/transactions/{rent['id']}").status_code == 204
+    assert balance(client, account["id"], "2026-08-31") == 520.0
+
+
+def test_balance_of_a_missing_account_is_404(client):
+    response = client.get("/accounts/999999/balance", params={"as_of": "2026-01-31"})
+    assert response.status_code == 404
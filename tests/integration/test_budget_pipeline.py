@@ -0,0 +1,208 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.db.database import SessionLocal
+from src.app.main import app
+from src.app.services import budget_progress
+from src.app.services.budget_pipeline import budget_pipeline
+from src.app.services.budget_progress import apply_budget_deltas
+from src.app.services.reconcile import reconcile
+from src.app.services.response_cache import response_cache
+
+
+def reconcile_users(client, user: dict, budget: dict) -> None:
+    reconcile(SessionLocal, [user["id"]])
+
+
+def change_period(client, user: dict, budget: dict) -> None:
+    response = client.patch(f"/budgets/{budget['id']}", json={"period": "yearly"})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("rebuild", [reconcile_users, change_period])
+def test_rebuilds_drop_deltas_queued_in_another_process(client, make_user, monkeypatch, rebuild):
+    user = make_user("pipeline")
+    budget = client.post(
+        "/budgets/",
+        json={
+            "name": "Groceries",
+            "target_amount": 100,
+            "period": "monthly",
+            "user_id": user["id"],
+            "category_id": user["category_id"],
+        },
+    ).json()
+
+    # Another worker's queue, which this process can neither see nor flush
+    elsewhere = defaultdict(int)
+
+    def enqueue_elsewhere(deltas):
+        for key, delta in deltas.items():
+            elsewhere[key] += delta
+
+    monkeypatch.setattr(budget_pipeline, "enqueue", enqueue_elsewhere)
+    response = client.post(
+        "/transactions/",
+        json={
+            "amount": 25,
+            "date": date.today().isoformat(),
+            "user_id": user["id"],
+            "account_id": user["account_id"],
+            "category_id": user["category_id"],
+        },
+    )
+    assert response.status_code == 201
+
+    # The rebuild counts the transaction, then the other worker flushes
+    rebuild(client, user, budget)
+    with SessionLocal() as db:
+        apply_budget_deltas(db, elsewhere)
+        db.commit()
+
+    progress = client.get(f"/budgets/{budget['id']}/progress").json()
+    assert progress["current_spent"] == 25.0
+    assert client.get(f"/budgets/{budget['id']}").json()["current_spent"] == 25.0
+
+
+def test_flushes_drop_cached_dashboards(client, make_user, monkeypatch):
+    user = make_user("cached")
+    monkeypatch.setattr(response_cache, "ttl", 60)
+    client.post(
+        "/budgets/",
+        json={
+            "name": "Groceries",
+            "target_amount": 100,
+            "period": "monthly",
+            "user_id": user["id"],
+            "category_id": user["category_id"],
+        },
+    )
+
+    # Queued by another worker, so this process's reads cannot flush it
+    elsewhere = defaultdict(int)
+
+    def enqueue_elsewhere(deltas):
+        for key, delta in deltas.items():
+            elsewhere[key] += delta
+
+    monkeypatch.setattr(budget_pipeline, "enqueue", enqueue_elsewhere)
+    response = client.post(
+        "/transactions/",
+        json={
+            "amount": 25,
+            "date": date.today().isoformat(),
+            "user_id": user["id"],
+            "account_id": user["account_id"],
+            "category_id": user["category_id"],
+        },
+    )
+    assert response.status_code == 201
+
+    def budget_spent():
+        summary = client.get("/dashboard/budget-summary", params={"user_id": user["id"]})
+        return [row["spent"] for row in summary.json()]
+
+    assert budget_spent() == [0.0]
+    with SessionLocal() as db:
+        apply_budget_deltas(db, elsewhere)
+        db.commit()
+    assert budget_spent() == [25.0]
+
+
+def test_counters_move_on_to_a_new_period(client, make_user, monkeypatch):
+    user = make_user("rollover")
+    last_month = date.today().replace(day=1) - timedelta(days=1)
+
+    class LastMonth(date):
+        @classmethod
+        def today(cls):
+            return last_month
+
+    with monkeypatch.context() as patch:
+        patch.setattr(budget_progress, "date", LastMonth)
+        budget = client.post(
+            "/budgets/",
+            json={
+                "name": "Groceries",
+                "target_amount": 100,
+                "period": "monthly",
+                "user_id": user["id"],
+                "category_id": user["category_id"],
+            },
+        ).json()
+        response = client.post(
+            "/transactions/",
+            json={
+                "amount": 7.5,
+                "date": last_month.isoformat(),
+                "user_id": user["id"],
+                "account_id": user["account_id"],
+                "category_id": user["category_id"],
+            },
+        )
+        assert response.status_code == 201
+        budget_pipeline.flush()
+
+    # Nothing spent yet this month, whatever the counters held last month
+    assert client.get(f"/budgets/{budget['id']}").json()["current_spent"] == 0.0
+    listed = client.get("/budgets/", params={"user_id": user["id"]}).json()
+    assert [(row["current_spent"], row["remaining"]) for row in listed] == [(0.0, 100.0)]
+    assert client.get(f"/budgets/{budget['id']}/progress").json()["current_spent"] == 0.0
+
+
+def test_budget_changes_run_next_to_flushes(client, make_user):
+    user = make_user("repatch")
+    budgets = [
+        client.post(
+            "/budgets/",
+            json={
+                "name": f"Budget {number}",
+                "target_amount": 100,
+                "period": "monthly",
+                "user_id": user["id"],
+                "category_id": user["category_id"],
+            },
+        ).json()
+        for number in range(4)
+    ]
+
+    def spend(_) -> None:
+        test_client = TestClient(app)
+        for _ in range(10):
+            response = test_client.post(
+                "/transactions/",
+                json={
+                    "amount": 1,
+                    "date": date.today().isoformat(),
+                    "user_id": user["id"],
+                    "account_id": user["account_id"],
+                    "category_id": user["category_id"],
+                },
+            )
+            assert response.status_code == 201
+            budget_pipeline.flush()
+
+    def repatch(budget: dict) -> None:
+        test_client = TestClient(app)
+        for period in ["weekly", "yearly", "monthly"] * 3:
+            response = test_client.patch(f"/budgets/{budget['id']}", json={"period": period})
+            assert response.status_code == 200
+
+    def rebuild(_) -> None:
+        for _ in range(10):
+            reconcile(SessionLocal, [user["id"]])
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        running = [pool.submit(spend, n) for n in range(4)]
+        running += [pool.submit(repatch, budget) for budget in budgets]
+        running += [pool.submit(rebuild, n) for n in range(2)]
+        for future in running:
+            future.result()
+    budget_pipeline.flush()
+
+    for budget in budgets:
+        assert client.get(f"/budgets/{budget['id']}").json()["current_spent"] == 40.0
@@ -0,0 +1,30 @@
+from datetime import date
+
+
+def add_expense(client, user: dict, amount: float, category_id) -> None:
+    response = client.post(
+        "/transactions/",
+        json={
+            "amount": amount,
+            "date": date.today().isoformat(),
+            "is_income": False,
+            "user_id": user["id"],
+            "account_id": user["account_id"],
+            "category_id": category_id,
+        },
+    )
+    assert response.status_code == 201
+
+
+def test_deleting_a_category_keeps_its_totals(client, make_user):
+    user = make_user("cleanup")
+    add_expense(client, user, 12.5, user["category_id"])
+    # Already has an uncategorized bucket for the same month and account
+    add_expense(client, user, 7.5, None)
+
+    assert client.delete(f"/categories/{user['category_id']}").status_code == 204
+
+    summary = client.get("/dashboard/summary", params={"user_id": user["id"]}).json()
+    assert summary["expenses"] == 20.0
+    transactions = client.get("/transactions/", params={"user_id": user["id"]}).json()
+    assert {row["category_id"] for row in transactions} == {None}
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import pytest
+
+
+def add_budgets(client, user: dict, periods) -> None:
+    for number, period in enumerate(periods, start=1):
+        response = client.post(
+            "/budgets/",
+            json={
+                "name": f"Budget {number}",
+                "target_amount": 100,
+                "period": period,
+                "user_id": user["id"],
+                "category_id": user["category_id"],
+            },
+        )
+        assert response.status_code == 201
+
+
+def add_expense(client, user: dict, amount: float, day: date) -> None:
+    response = client.post(
+        "/transactions/",
+        json={
+            "amount": amount,
+            "date": day.isoformat(),
+            "is_income": False,
+            "user_id": user["id"],
+            "account_id": user["account_id"],
+            "category_id": user["category_id"],
+        },
+    )
+    assert response.status_code == 201
+
+
+@pytest.mark.parametrize("endpoint", ["/dashboard/budget-summary", "/dashboard/overview"])
+def test_query_count_does_not_grow_with_budgets(client, make_user, recorded_statements, endpoint):
+    one = make_user("one")
+    many = make_user("many")
+    add_budgets(client, one, ["monthly"])
+    add_budgets(client, many, ["weekly", "monthly", "yearly"] * 10)
+    for user in (one, many):
+        add_expense(client, user, 12.5, date.today())
+
+    counts = {}
+    for user in (one, many):
+        with recorded_statements() as statements:
+            response = client.get(endpoint, params={"user_id": user["id"]})
+        assert response.status_code == 200
+        counts[user["id"]] = len(statements)
+
+    assert counts[one["id"]] == counts[many["id"]]
+
+
+def test_spent_follows_each_budget_period(client, make_user):
+    user = make_user("periods")
+    add_budgets(client, user, ["weekly", "monthly", "yearly"])
+    today = date.today()
+    add_expense(client, user, 10, today)
+    # A previous year is outside every current period
+    add_expense(client, user, 99, today.replace(year=today.year - 1, day=1))
+    # Eight days back is outside this week, even on a Sunday
+    add_expense(client, user, 5, today - timedelta(days=8))
+
+    rows = client.get("/dashboard/budget-summary", params={"user_id": user["id"]}).json()
+
+    earlier = today - timedelta(days=8)
+    expected = {
+        "Budget 1": 10.0,
+        "Budget 2": 15.0 if earlier.month == today.month else 10.0,
+        "Budget 3": 15.0 if earlier.year == today.year else 10.0,
+    }
+    assert {row["name"]: row["spent"] for row in rows} == expected
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from src.app.services.idempotency import idempotency_store
+
+
+def post_expense(client, user: dict, key: str, amount: float = 12.5):
+    return client.post(
+        "/transactions/",
+        headers={"Idempotency-Key": key},
+        json={
+            "amount": amount,
+            "date": "2026-03-10",
+            "user_id": user["id"],
+            "account_id": user["account_id"],
+        },
+    )
+
+
+def transaction_count(client, user: dict) -> int:
+    return len(client.get("/transactions/", params={"user_id": user["id"]}).json())
+
+
+def test_retries_replay_the_first_response(client, make_user):
+    user = make_user("retries")
+
+    first = post_expense(client, user, "replay-1")
+    again = post_expense(client, user, "replay-1")
+
+    assert first.status_code == again.status_code == 201
+    assert again.json() == first.json()
+    assert transaction_count(client, user) == 1
+
+
+def test_reused_key_with_another_body_is_rejected(client, make_user):
+    user = make_user("reuse")
+
+    assert post_expense(client, user, "reuse-1").status_code == 201
+    assert post_expense(client, user, "reuse-1", amount=99).status_code == 422
+    assert transaction_count(client, user) == 1
+
+
+def test_expired_key_can_be_used_again(client, make_user, monkeypatch):
+    user = make_user("expired")
+
+    # Stored already expired, and not yet purged
+    with monkeypatch.context() as patch:
+        patch.setattr(idempotency_store, "ttl", timedelta(seconds=-1))
+        first = post_expense(client, user, "expired-1")
+    assert first.status_code == 201
+
+    again = post_expense(client, user, "expired-1")
+    assert again.status_code == 201
+    assert again.json()["id"] != first.json()["id"]
+    assert post_expense(client, user, "expired-1").json() == again.json()
@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.app.db.database import SessionLocal
+from src.app.db.models.transaction import Transaction
+from src.app.main import app
+from src.app.services.checkpoints import extend_checkpoints
+from src.app.services.ledger import lock_accounts
+
+
+def test_moving_a_transaction_locks_its_account(client, make_user, recorded_statements):
+    user = make_user("ledger")
+    transaction = client.post(
+        "/transactions/",
+        json={
+            "amount": 40,
+            "date": "2026-01-10",
+            "user_id": user["id"],
+            "account_id": user["account_id"],
+        },
+    ).json()
+
+    # Same amount, another month: the balance does not change, checkpoints do
+    with recorded_statements() as statements:
+        response = client.patch(f"/transactions/{transaction['id']}", json={"date": "2026-03-10"})
+    assert response.status_code == 200
+
+    assert any(
+        "FROM accounts" in statement and "FOR NO KEY UPDATE" in statement
+        for statement, _ in statements
+    )
+
+
+def test_moves_between_months_run_next_to_inserts(client, make_user):
+    user = make_user("movers")
+    account_id = user["account_id"]
+
+    def post(test_client, day: str) -> dict:
+        response = test_client.post(
+            "/transactions/",
+            json={"amount": 10, "date": day, "user_id": user["id"], "account_id": account_id},
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    # Month-end checkpoints for the moves to shift
+    response = client.get(f"/accounts/{account_id}/balance", params={"as_of": "2026-06-30"})
+    assert response.status_code == 200
+
+    def work(worker: int) -> None:
+        test_client = TestClient(app)
+        moved = post(test_client, "2026-01-15")
+        for step in range(15):
+            post(test_client, "2026-02-15")
+            day = f"2026-0{3 + (worker + step) % 3}-15"
+            response = test_client.patch(f"/transactions/{moved['id']}", json={"date": day})
+            assert response.status_code == 200
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        list(pool.map(work, range(12)))
+
+    # 12 x 16 expenses of 10.00, all dated before the end of June
+    balance = client.get(f"/accounts/{account_id}/balance", params={"as_of": "2026-06-30"}).json()
+    assert balance["balance"] == -1920.0
+    assert client.get(f"/accounts/{account_id}").json()["current_balance"] == -1920.0
+
+
+def test_account_locks_let_foreign_key_checks_through(client, make_user):
+    user = make_user("fk-locks")
+    with SessionLocal() as inserting, SessionLocal() as locking:
+        # The insert's foreign-key check holds KEY SHARE on the account row
+        inserting.add(
+            Transaction(
+                amount=100,
+                date=date(2026, 1, 10),
+                user_id=user["id"],
+                account_id=user["account_id"],
+            )
+        )
+        inserting.flush()
+
+        # A FOR UPDATE here would queue ahead of the inserter's balance UPDATE
+        locking.execute(text("SET LOCAL lock_timeout = '2s'"))
+        lock_accounts(locking, {user["account_id"]})
+        extend_checkpoints(locking, user["account_id"], date(2026, 1, 31))
+        locking.rollback()
+        inserting.rollback()
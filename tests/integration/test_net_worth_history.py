@@ -0,0 +1,25 @@
+def test_points_are_dated_with_the_day_of_their_balance(client, make_user):
+    user = make_user("history")
+    response = client.post(
+        "/transactions/",
+        json={
+            "amount": 100,
+            "date": "2026-02-28",
+            "is_income": True,
+            "user_id": user["id"],
+            "account_id": user["account_id"],
+        },
+    )
+    assert response.status_code == 201
+
+    history = client.get(
+        "/summary/net-worth/history",
+        params={"user_id": user["id"], "from": "2026-01-15", "to": "2026-03-20"},
+    ).json()
+
+    # Month ends, then `to` for the month still in progress
+    assert [(point["date"], point["net_worth"]) for point in history["points"]] == [
+        ("2026-01-31", 0.0),
+        ("2026-02-28", 100.0),
+        ("2026-03-20", 100.0),
+    ]
@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+
+from sqlalchemy import Date, String, column, select, values
+
+from src.app.services.budget_progress import period_end_of, period_start_of
+from src.app.services.periods import period_window
+
+
+def test_sql_periods_match_period_window(database):
+    # Every weekday, month end and year end over two years, plus an unknown period
+    days = [date(2023, 12, 25) + timedelta(days=n) for n in range(0, 750, 3)]
+    samples = values(column("period", String), column("day", Date), name="samples").data(
+        [(period, day) for period in ("weekly", "monthly", "yearly", "fortnightly") for day in days]
+    )
+    start = period_start_of(samples.c.period, samples.c.day)
+    query = select(
+        samples.c.period,
+        samples.c.day,
+        start.label("start"),
+        period_end_of(samples.c.period, start).label("end"),
+    )
+
+    with database.connect() as conn:
+        rows = conn.execute(query).all()
+
+    assert len(rows) == 4 * len(days)
+    for row in rows:
+        assert (row.start, row.end) == period_window(row.period, row.day), row
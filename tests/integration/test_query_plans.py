@@ -0,0 +1,128 @@
+"""
+EXPLAIN checks that the dashboard and summary aggregates seek their indexes
+by date range instead of filtering a user's whole history.
+
+Sequential scans are disabled while explaining, since the planner would
+scan tables this small anyway. That alone would still let a non-sargable
+predicate walk a whole index, so the date (or month) column must also
+appear in the index condition.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+
+def explain(database, statement, parameters) -> dict:
+    with database.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+        result = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        return result.scalar()[0]["Plan"]
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def query_plans(client, recorded_statements, database, path: str, params: dict) -> list:
+    with recorded_statements() as statements:
+        response = client.get(path, params=params)
+    assert response.status_code == 200
+
+    return [
+        explain(database, statement, parameters)
+        for statement, parameters in statements
+        if statement.lstrip().upper().startswith(("SELECT", "WITH"))
+    ]
+
+
+def index_conditions(plans: list, index_name: str) -> list:
+    return [
+        node.get("Index Cond", "")
+        for plan in plans
+        for node in plan_nodes(plan)
+        if node.get("Index Name") == index_name
+    ]
+
+
+def seq_scanned(plans: list) -> set:
+    return {
+        node["Relation Name"]
+        for plan in plans
+        for node in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan"
+    }
+
+
+@pytest.fixture
+def user(client, make_user) -> dict:
+    user = make_user("plans")
+    client.post(
+        "/budgets/",
+        json={
+            "name": "Groceries",
+            "target_amount": 300,
+            "period": "weekly",
+            "user_id": user["id"],
+            "category_id": user["category_id"],
+        },
+    )
+    for day in (date.today(), date.today().replace(year=date.today().year - 1)):
+        client.post(
+            "/transactions/",
+            json={
+                "amount": 12.5,
+                "date": day.isoformat(),
+                "user_id": user["id"],
+                "account_id": user["account_id"],
+                "category_id": user["category_id"],
+            },
+        )
+    return user
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/dashboard/summary", {}),
+        ("/dashboard/by-category", {}),
+        ("/dashboard/by-month", {}),
+        ("/dashboard/overview", {}),
+        ("/summary/monthly", {"year": date.today().year, "month": date.today().month}),
+    ],
+)
+def test_rollup_aggregates_seek_by_month(client, recorded_statements, database, user, path, params):
+    plans = query_plans(client, recorded_statements, database, path, {"user_id": user["id"], **params})
+
+    conditions = index_conditions(plans, "uq_monthly_rollups_key")
+    assert conditions
+    assert all("user_id" in condition and "month" in condition for condition in conditions)
+    assert not {"monthly_rollups", "transactions"} & seq_scanned(plans)
+
+
+@pytest.mark.parametrize("path", ["/dashboard/budget-summary", "/dashboard/overview"])
+def test_budget_progress_seeks_the_current_period_row(client, recorded_statements, database, user, path):
+    plans = query_plans(client, recorded_statements, database, path, {"user_id": user["id"]})
+
+    conditions = index_conditions(plans, "uq_budget_periods_budget_start")
+    assert conditions
+    assert all("period_start" in condition for condition in conditions)
+    assert not {"budget_periods", "transactions"} & seq_scanned(plans)
+
+
+def test_transaction_date_filters_seek_the_user_date_index(client, recorded_statements, database, user):
+    start, end = date.today().replace(month=1, day=1), date.today()
+    plans = query_plans(
+        client,
+        recorded_statements,
+        database,
+        "/transactions/",
+        {"user_id": user["id"], "min_date": start.isoformat(), "max_date": end.isoformat()},
+    )
+
+    conditions = index_conditions(plans, "ix_transactions_user_date_id")
+    assert conditions
+    assert all("date >=" in condition and "date <=" in condition for condition in conditions)
+    assert "transactions" not in seq_scanned(plans)
@@ -0,0 +1,52 @@
+from datetime import date
+
+from sqlalchemy import event
+
+from src.app.db import database as db_module
+from src.app.db.database import READ_YOUR_WRITES_COOKIE, RoutingSession, make_engine
+
+
+def test_writes_pin_the_clients_reads_in_every_worker(client, make_user, database, monkeypatch):
+    # A second pool on the same database stands in for the replica
+    replica = make_engine(database.url.render_as_string(hide_password=False))
+    replica_statements = []
+    event.listen(
+        replica,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *rest: replica_statements.append(statement),
+    )
+    monkeypatch.setattr(RoutingSession, "replica", replica)
+
+    user = make_user("pinned")
+    response = client.post(
+        "/transactions/",
+        json={
+            "amount": 12.5,
+            "date": date.today().isoformat(),
+            "user_id": user["id"],
+            "account_id": user["account_id"],
+        },
+    )
+    assert response.status_code == 201
+    assert READ_YOUR_WRITES_COOKIE in response.cookies
+
+    try:
+        # A worker that did not serve the write has no pin of its own
+        monkeypatch.setattr(db_module, "_pinned_until", {})
+        assert len(client.get("/transactions/", params={"user_id": user["id"]}).json()) == 1
+        assert replica_statements == []
+
+        client.cookies.clear()
+        assert len(client.get("/transactions/", params={"user_id": user["id"]}).json()) == 1
+        assert replica_statements
+    finally:
+        replica.dispose()
+
+
+def test_reads_set_no_cookie(client, make_user):
+    user = make_user("reader")
+    client.cookies.clear()
+
+    response = client.get("/transactions/", params={"user_id": user["id"]})
+    assert response.status_code == 200
+    assert READ_YOUR_WRITES_COOKIE not in response.cookies
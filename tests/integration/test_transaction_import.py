@@ -0,0 +1,50 @@
+import json
+
+from src.app.services import transaction_import
+
+
+def rows_for(user: dict, count: int) -> list:
+    return [
+        {
+            "amount": 1.25,
+            "date": "2026-03-10",
+            "description": f"Coffee {number}",
+            "account_id": user["account_id"],
+            "category_id": user["category_id"],
+        }
+        for number in range(count)
+    ]
+
+
+def test_json_rows_are_read_across_chunks(client, make_user, monkeypatch):
+    user = make_user("import")
+    # Rows, strings and numbers all straddle chunk boundaries
+    monkeypatch.setattr(transaction_import, "READ_SIZE", 7)
+
+    response = client.post(
+        "/transactions/bulk",
+        params={"user_id": user["id"]},
+        content=json.dumps(rows_for(user, 25), indent=2),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 201
+    assert response.json() == {"imported": 25}
+
+    transactions = client.get("/transactions/", params={"user_id": user["id"], "limit": 100}).json()
+    assert sorted(row["description"] for row in transactions) == sorted(
+        f"Coffee {number}" for number in range(25)
+    )
+
+
+def test_malformed_json_imports_nothing(client, make_user):
+    user = make_user("broken")
+    body = json.dumps(rows_for(user, 3))[:-1] + ", }"
+
+    response = client.post(
+        "/transactions/bulk",
+        params={"user_id": user["id"]},
+        content=body,
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 422
+    assert client.get("/transactions/", params={"user_id": user["id"]}).json() == []
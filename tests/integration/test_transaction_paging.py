@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import date, timedelta
+
+import pytest
+
+SORT_ORDERS = {
+    "date_desc": (lambda row: (row["date"], row["id"]), True),
+    "date_asc": (lambda row: (row["date"], row["id"]), False),
+    "amount_desc": (lambda row: (row["amount"], row["id"]), True),
+    "amount_asc": (lambda row: (row["amount"], row["id"]), False),
+}
+
+
+def raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def add_transactions(client, user: dict, count: int) -> list:
+    rows = []
+    for number in range(count):
+        # Few distinct dates and amounts, so most keys tie and id decides
+        response = client.post(
+            "/transactions/",
+            json={
+                "amount": 5 + number % 3,
+                "date": (date(2026, 3, 1) + timedelta(days=number % 4)).isoformat(),
+                "user_id": user["id"],
+                "account_id": user["account_id"],
+            },
+        )
+        assert response.status_code == 201
+        rows.append(response.json())
+    return rows
+
+
+def walk_pages(client, user: dict, sort: str, limit: int) -> list:
+    rows, cursor = [], None
+    while True:
+        params = {"user_id": user["id"], "sort": sort, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/transactions/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= limit
+        rows += page
+
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return rows
+
+
+@pytest.mark.parametrize("sort", SORT_ORDERS)
+def test_cursor_pages_cover_every_row_once_in_order(client, make_user, sort):
+    user = make_user("pages")
+    added = add_transactions(client, user, 23)
+    key, descending = SORT_ORDERS[sort]
+
+    rows = walk_pages(client, user, sort, limit=5)
+    assert [row["id"] for row in rows] == [
+        row["id"] for row in sorted(added, key=key, reverse=descending)
+    ]
+
+
+def test_rows_added_between_pages_do_not_repeat_rows(client, make_user):
+    user = make_user("moving")
+    add_transactions(client, user, 8)
+
+    first = client.get("/transactions/", params={"user_id": user["id"], "limit": 4})
+    # Newest first, so a new row lands on the page already read
+    add_transactions(client, user, 3)
+    second = client.get(
+        "/transactions/",
+        params={"user_id": user["id"], "limit": 4, "cursor": first.headers["X-Next-Cursor"]},
+    )
+
+    first_ids = {row["id"] for row in first.json()}
+    second_ids = {row["id"] for row in second.json()}
+    assert len(second_ids) == 4 and not first_ids & second_ids
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        raw_cursor({"sort": "date_desc"}),
+        raw_cursor(["date_desc", "2026-03-01"]),
+        raw_cursor(["date_desc", 5, 1]),
+        raw_cursor(["date_desc", "2026-03-01", None]),
+        raw_cursor(["amount_desc", "2026-03-01", "1"]),
+    ],
+)
+def test_malformed_cursors_are_rejected(client, make_user, cursor):
+    user = make_user("paging")
+    response = client.get("/transactions/", params={"user_id": user["id"], "cursor": cursor})
+    assert response.status_code == 400
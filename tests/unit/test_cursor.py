@@ -0,0 +1,39 @@
+from datetime import date
+
+import pytest
+
+from src.app.utils.cursor import decode_cursor, encode_cursor
+
+
+def test_round_trip_gives_back_strings():
+    cursor = encode_cursor("date_desc", date(2026, 3, 1), 42)
+    assert decode_cursor(cursor) == ["date_desc", "2026-03-01", "42"]
+
+
+def test_cursor_is_url_safe_and_unpadded():
+    # Lengths that base64 would pad, and bytes that encode to + and /
+    for value in ["", "a", "ab", "abc", "~~~>>>???"]:
+        cursor = encode_cursor(value)
+        assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+        assert decode_cursor(cursor) == [value]
+
+
+def test_unicode_values_survive():
+    assert decode_cursor(encode_cursor("café", "€5")) == ["café", "€5"]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "!!!!",
+        "bm90IGpzb24",  # "not json"
+        "eyJhIjogMX0",  # {"a": 1}
+        "WyJhIiwgMV0",  # ["a", 1]
+        "WyJhIiwgbnVsbF0",  # ["a", null]
+        "IjEi",  # "1"
+    ],
+)
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
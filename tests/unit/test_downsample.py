@@ -0,0 +1,38 @@
+import math
+
+import pytest
+
+from src.app.services.downsample import lttb_indices
+
+
+def series(n: int):
+    return [(float(x), math.sin(x / 7) * 100) for x in range(n)]
+
+
+@pytest.mark.parametrize("n, threshold", [(0, 10), (1, 10), (5, 5), (5, 9), (50, 2), (50, 0)])
+def test_short_series_and_tiny_thresholds_keep_every_point(n, threshold):
+    assert lttb_indices(series(n), threshold) == list(range(n))
+
+
+@pytest.mark.parametrize("n, threshold", [(6, 3), (10, 9), (100, 7), (1000, 100), (1001, 250)])
+def test_keeps_threshold_points_in_order_with_both_ends(n, threshold):
+    kept = lttb_indices(series(n), threshold)
+
+    assert len(kept) == threshold
+    assert kept[0] == 0 and kept[-1] == n - 1
+    assert kept == sorted(set(kept))
+
+
+def test_spikes_survive():
+    points = [(float(x), 0.0) for x in range(200)]
+    points[57] = (57.0, 500.0)
+    points[141] = (141.0, -300.0)
+
+    kept = lttb_indices(points, 10)
+    assert 57 in kept and 141 in kept
+
+
+def test_a_straight_line_still_keeps_one_point_per_bucket():
+    points = [(float(x), 2.0 * x) for x in range(30)]
+    kept = lttb_indices(points, 5)
+    assert len(kept) == 5 and kept[0] == 0 and kept[-1] == 29
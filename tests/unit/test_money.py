@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from src.app.core.money import Money, MoneyIn, MoneyOut, format_dollars, to_cents, to_dollars
+
+
+@pytest.mark.parametrize(
+    "dollars, cents",
+    [
+        (0, 0),
+        (12, 1200),
+        (12.34, 1234),
+        ("12.34", 1234),
+        (Decimal("12.34"), 1234),
+        (0.1 + 0.2, 30),
+        ("0.005", 1),
+        ("-0.005", -1),
+        ("0.0049", 0),
+        (-12.345, -1235),
+        ("1e3", 100000),
+        (10**15, 10**17),
+    ],
+)
+def test_to_cents(dollars, cents):
+    assert to_cents(dollars) == cents
+
+
+@pytest.mark.parametrize("dollars", ["", "abc", "12,34", "nan", "inf", "-Infinity", None])
+def test_to_cents_rejects_non_amounts(dollars):
+    with pytest.raises(ValueError):
+        to_cents(dollars)
+
+
+@pytest.mark.parametrize("cents", [0, 1, -1, 99, 1234, -1234, 10**13 + 7])
+def test_cents_round_trip_through_dollars(cents):
+    assert to_cents(to_dollars(cents)) == cents
+    assert to_cents(format_dollars(cents)) == cents
+
+
+@pytest.mark.parametrize(
+    "cents, text",
+    [(0, "0.00"), (5, "0.05"), (-5, "-0.05"), (1234, "12.34"), (-1234, "-12.34"), (100, "1.00")],
+)
+def test_format_dollars(cents, text):
+    assert format_dollars(cents) == text
+
+
+def test_to_dollars_passes_none_through():
+    assert to_dollars(None) is None
+
+
+class Payment(BaseModel):
+    amount: MoneyIn
+
+
+class Balance(BaseModel):
+    balance: MoneyOut
+
+
+def test_money_fields_take_dollars_and_give_dollars():
+    assert Payment(amount="19.99").amount == 1999
+    assert Payment(amount=19.99).amount == 1999
+    assert Balance(balance=1999).model_dump(mode="json") == {"balance": 19.99}
+
+    with pytest.raises(ValidationError):
+        Payment(amount="lots")
+
+
+def test_money_columns_bind_only_integer_cents():
+    column = Money()
+    assert column.process_bind_param(1234, None) == 1234
+    assert column.process_bind_param(None, None) is None
+    with pytest.raises(TypeError):
+        column.process_bind_param(12.34, None)
+
+    assert column.process_result_value(Decimal(1234), None) == 1234
+    assert type(column.process_result_value(Decimal(1234), None)) is int
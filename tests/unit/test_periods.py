@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src.app.services.periods import month_window, period_window, trailing_months_window
+
+
+@pytest.mark.parametrize(
+    "day, window",
+    [
+        (date(2026, 1, 1), (date(2026, 1, 1), date(2026, 2, 1))),
+        (date(2026, 2, 28), (date(2026, 2, 1), date(2026, 3, 1))),
+        (date(2024, 2, 29), (date(2024, 2, 1), date(2024, 3, 1))),
+        (date(2026, 12, 31), (date(2026, 12, 1), date(2027, 1, 1))),
+    ],
+)
+def test_month_window(day, window):
+    assert month_window(day) == window
+
+
+def test_trailing_months_window_crosses_years():
+    assert trailing_months_window(date(2026, 3, 15), 12) == (date(2025, 4, 1), date(2026, 4, 1))
+    assert trailing_months_window(date(2026, 3, 15), 1) == (date(2026, 3, 1), date(2026, 4, 1))
+
+
+@pytest.mark.parametrize(
+    "period, day, window",
+    [
+        # 2026-03-02 is a Monday
+        ("weekly", date(2026, 3, 2), (date(2026, 3, 2), date(2026, 3, 9))),
+        ("weekly", date(2026, 3, 8), (date(2026, 3, 2), date(2026, 3, 9))),
+        ("weekly", date(2026, 1, 1), (date(2025, 12, 29), date(2026, 1, 5))),
+        ("monthly", date(2026, 12, 31), (date(2026, 12, 1), date(2027, 1, 1))),
+        ("yearly", date(2026, 12, 31), (date(2026, 1, 1), date(2027, 1, 1))),
+        ("fortnightly", date(2026, 3, 8), (date(2026, 3, 1), date(2026, 4, 1))),
+    ],
+)
+def test_period_window(period, day, window):
+    assert period_window(period, day) == window
+
+
+@pytest.mark.parametrize("period", ["weekly", "monthly", "yearly"])
+def test_period_windows_tile_the_calendar(period):
+    day = date(2023, 12, 1)
+    start, end = period_window(period, day)
+    while day < date(2025, 2, 1):
+        if day >= end:
+            # The next window starts where the last one ended
+            assert period_window(period, day)[0] == end
+            start, end = period_window(period, day)
+        assert start <= day < end
+        day += timedelta(days=1)